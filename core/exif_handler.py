@@ -1,16 +1,47 @@
 """EXIF metadata handling for image ratings"""
-import piexif
+import mmap
+import os
+import struct
+import threading
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
 from PySide6.QtWidgets import QMessageBox
 
 
+class RatingSignals(QObject):
+    """Signals to hand ratings read in the background back to the GUI thread"""
+    rating_read = Signal(object, int)
+
+
+class RatingWorker(QRunnable):
+    """Reads an image rating in a worker thread"""
+    
+    def __init__(self, image_path, read_rating, signals):
+        super().__init__()
+        self.image_path = image_path
+        self.read_rating = read_rating
+        self.signals = signals
+    
+    def run(self):
+        self.signals.rating_read.emit(self.image_path, self.read_rating(self.image_path))
+
+
 class ExifHandler:
     """Handles EXIF metadata operations, particularly image ratings"""
     
     RATING_TAG = 18246  # Windows Rating Tag
     ORIENTATION_TAG = 274
+    RATING_VALUE_FORMATS = {3: 'H', 4: 'I'}  # TIFF type SHORT / LONG -> struct format
+    RATING_STRINGS = ("", "★☆☆☆☆", "★★☆☆☆", "★★★☆☆", "★★★★☆", "★★★★★")
+    RATING_CACHE_SIZE = 512  # Ratings kept in memory, least recently read dropped first
+    RATING_READ_PRIORITY = 2  # Thread pool queue priority, ahead of image decodes
+    TIFF_HEADERS = (b'II*\x00', b'MM\x00*')  # Little / big endian TIFF magic
     
     def __init__(self, translator=None):
         self.translator = translator
+        self._rating_cache = {}  # Path string -> (mtime_ns, rating), in order of last use
+        self._rating_cache_lock = threading.Lock()  # Ratings are read on several pool threads
+        self._rating_signals = RatingSignals()
+        self.rating_read = self._rating_signals.rating_read
     
     def set_translator(self, translator):
         """Set translator for error messages"""
@@ -18,7 +49,58 @@ class ExifHandler:
     
     def get_image_rating(self, image_path):
         """Read rating (0-5) from EXIF tag 18246 (Windows Rating Tag)"""
+        # Reuse the last read while the file is unchanged
+        key = os.fspath(image_path)
         try:
+            mtime_ns = os.stat(key).st_mtime_ns
+        except OSError:
+            return 0
+        with self._rating_cache_lock:
+            cached = self._rating_cache.get(key)
+        if cached is not None and cached[0] == mtime_ns:
+            rating = cached[1]
+        else:
+            # Read outside the lock so other threads are not held up by the file
+            rating = self._read_rating(image_path)
+        self._remember_rating(key, mtime_ns, rating)
+        return rating
+    
+    def _remember_rating(self, key, mtime_ns, rating):
+        """Cache the rating of a file version, unless a newer version is cached already"""
+        with self._rating_cache_lock:
+            cached = self._rating_cache.pop(key, None)
+            if cached is not None and cached[0] > mtime_ns:
+                # Read before the file was rated again, keep the newer rating
+                mtime_ns, rating = cached
+            # Re-insert so the dict order tracks recency
+            self._rating_cache[key] = (mtime_ns, rating)
+            if len(self._rating_cache) > self.RATING_CACHE_SIZE:
+                del self._rating_cache[next(iter(self._rating_cache))]
+    
+    def get_cached_rating(self, image_path):
+        """Return the last rating read for an image without touching the disk, None if unknown"""
+        with self._rating_cache_lock:
+            cached = self._rating_cache.get(os.fspath(image_path))
+        return cached[1] if cached is not None else None
+    
+    def read_rating_in_background(self, image_path):
+        """Read a rating in a worker thread, rating_read is emitted with the result"""
+        worker = RatingWorker(image_path, self.get_image_rating, self._rating_signals)
+        QThreadPool.globalInstance().start(worker, self.RATING_READ_PRIORITY)
+    
+    def _read_rating(self, image_path):
+        """Read rating from file without caching"""
+        try:
+            # JPEG and TIFF are read directly, other formats go through piexif
+            rating = self._fast_read_rating(image_path)
+            if rating is not None:
+                return min(max(rating, 0), 5)
+        except Exception:
+            pass
+        
+        try:
+            # piexif is imported on first use to keep it out of application startup
+            import piexif
             exif_dict = piexif.load(str(image_path))
             # Tag 18246 stores the Windows rating value
             if "0th" in exif_dict and self.RATING_TAG in exif_dict["0th"]:
@@ -28,11 +110,106 @@ class ExifHandler:
             pass
         return 0
     
+    def _fast_read_rating(self, image_path):
+        """Read rating from a JPEG or TIFF by scanning only IFD0, None if neither"""
+        with open(image_path, 'rb') as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return None  # Empty file
+            with data:
+                try:
+                    entry = self._find_rating_entry(data)
+                except (ValueError, struct.error):
+                    return None
+                if entry is None:
+                    return 0
+                value_offset, endian, value_format = entry
+                return struct.unpack_from(endian + value_format, data, value_offset)[0]
+    
+    def _patch_rating_in_place(self, image_path, rating):
+        """Overwrite an existing JPEG or TIFF rating value, False if the tag is missing"""
+        try:
+            with open(image_path, 'r+b') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    entry = self._find_rating_entry(data)
+                if entry is None:
+                    return False
+                value_offset, endian, value_format = entry
+                # A plain write, changes through a mapped view may not update the
+                # modification time on Windows, so backup and sync tools miss them
+                f.seek(value_offset)
+                f.write(struct.pack(endian + value_format, rating))
+            return True
+        except (ValueError, struct.error):
+            # Other format or unexpected layout, let piexif rewrite the EXIF block
+            return False
+    
+    def _find_rating_entry(self, data):
+        """Locate the rating value in JPEG or TIFF data
+        
+        Returns (value_offset, endian, struct_format) or None if the image has no
+        rating tag. Raises ValueError if data is not a JPEG or TIFF with parseable EXIF.
+        """
+        if data[:4] in self.TIFF_HEADERS:
+            # A TIFF file is itself the TIFF structure EXIF embeds in JPEGs
+            return self._find_rating_in_tiff(data, 0)
+        if data[:2] != b'\xff\xd8':
+            raise ValueError("Not a JPEG or TIFF file")
+        
+        # Walk the marker segments up to the start of the image data
+        pos = 2
+        while pos + 4 <= len(data):
+            if data[pos] != 0xFF:
+                raise ValueError("Invalid JPEG marker")
+            marker = data[pos + 1]
+            if marker == 0xFF:  # Fill byte
+                pos += 1
+                continue
+            if marker in (0xD9, 0xDA):  # End of image / start of scan
+                return None
+            length = struct.unpack_from('>H', data, pos + 2)[0]
+            if marker == 0xE1 and data[pos + 4:pos + 10] == b'Exif\x00\x00':
+                return self._find_rating_in_tiff(data, pos + 10)
+            pos += 2 + length
+        return None
+    
+    def _find_rating_in_tiff(self, data, tiff_start):
+        """Scan the IFD0 entries of a TIFF header for the rating tag"""
+        byte_order = data[tiff_start:tiff_start + 2]
+        if byte_order == b'II':
+            endian = '<'
+        elif byte_order == b'MM':
+            endian = '>'
+        else:
+            raise ValueError("Invalid TIFF byte order")
+        
+        ifd0_start = tiff_start + struct.unpack_from(endian + 'I', data, tiff_start + 4)[0]
+        entry_count = struct.unpack_from(endian + 'H', data, ifd0_start)[0]
+        for i in range(entry_count):
+            # Each entry: tag (u16), type (u16), count (u32), value/offset (u32)
+            entry = ifd0_start + 2 + 12 * i
+            tag, value_type, count = struct.unpack_from(endian + 'HHI', data, entry)
+            if tag == self.RATING_TAG:
+                if count != 1 or value_type not in self.RATING_VALUE_FORMATS:
+                    raise ValueError("Unexpected rating tag layout")
+                return entry + 8, endian, self.RATING_VALUE_FORMATS[value_type]
+        return None
+    
     def set_image_rating(self, image_path, rating, parent_widget=None):
         """Write rating (0-5) to EXIF tag 18246 (Windows Rating Tag)"""
+        key = os.fspath(image_path)
         try:
             rating = min(max(rating, 0), 5)  # Clamp to valid range
+            with self._rating_cache_lock:
+                self._rating_cache.pop(key, None)
+            
+            # Overwrite an existing rating value without rewriting the file
+            if self._patch_rating_in_place(image_path, rating):
+                self._remember_rating(key, os.stat(key).st_mtime_ns, rating)
+                return True
             
+            import piexif
             # Load existing EXIF data or create new structure
             try:
                 exif_dict = piexif.load(str(image_path))
@@ -44,6 +221,8 @@ class ExifHandler:
             exif_bytes = piexif.dump(exif_dict)
             piexif.insert(exif_bytes, str(image_path))
             
+            # Going back to the image shows the new rating without reading it again
+            self._remember_rating(key, os.stat(key).st_mtime_ns, rating)
             return True
         except Exception as e:
             if parent_widget and self.translator:
@@ -56,6 +235,4 @@ class ExifHandler:
     
     def format_rating_display(self, rating):
         """Format rating as stars (★☆)"""
-        if rating <= 0:
-            return ""
-        return "★" * rating + "☆" * (5 - rating)
+        return self.RATING_STRINGS[min(max(rating, 0), 5)]
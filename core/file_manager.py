@@ -1,4 +1,6 @@
 """File management operations for GuckMohl"""
+import os
+import shutil
 from pathlib import Path
 from PySide6.QtWidgets import QMessageBox
 
@@ -8,6 +10,8 @@ class FileManager:
     
     def __init__(self, translator=None):
         self.translator = translator
+        self._collision_counters = {}  # (archive folder, file name) -> last used counter
+        self._archive_folders = set()  # Archive folders known to exist
     
     def set_translator(self, translator):
         """Set translator for messages"""
@@ -16,21 +20,12 @@ class FileManager:
     def archive_image(self, image_path, archive_folder_name, parent_widget=None, archive_related_files=False):
         """Archive image to a subfolder"""
         try:
-            image_path = Path(image_path)
+            if not isinstance(image_path, Path):
+                image_path = Path(image_path)
             archive_folder = image_path.parent / archive_folder_name
-            archive_folder.mkdir(exist_ok=True)
-            
-            archive_path = archive_folder / image_path.name
+            self._ensure_archive_folder(archive_folder)
             
-            # Handle filename collisions by appending counter
-            counter = 1
-            while archive_path.exists():
-                stem = image_path.stem
-                suffix = image_path.suffix
-                archive_path = archive_folder / f"{stem}_{counter}{suffix}"
-                counter += 1
-            
-            image_path.rename(archive_path)
+            self._move_to_archive(image_path, archive_folder)
             
             # Archive related files with same stem but different extension
             if archive_related_files:
@@ -53,34 +48,148 @@ class FileManager:
                 )
             return False
     
+    def archive_batch(self, image_paths, archive_folder_name, archive_related_files=False):
+        """Archive several images at once
+        
+        Returns (archived, failed): the image paths that were moved and
+        (path, error) pairs of images and related files that could not be moved.
+        """
+        image_paths = [Path(image_path) for image_path in image_paths]
+        related = self._find_related_files_batch(image_paths) if archive_related_files else {}
+        archived = []
+        failed = []
+        
+        for image_path in image_paths:
+            archive_folder = image_path.parent / archive_folder_name
+            try:
+                self._ensure_archive_folder(archive_folder)
+                self._move_to_archive(image_path, archive_folder)
+            except Exception as e:
+                failed.append((image_path, e))
+                continue
+            archived.append(image_path)
+            
+            for file in related.get(image_path, ()):
+                try:
+                    self._move_to_archive(file, archive_folder)
+                except Exception as e:
+                    failed.append((file, e))
+        
+        return archived, failed
+    
+    def _move_to_archive(self, file, archive_folder):
+        """Move file into archive_folder without overwriting, return the new path"""
+        # Handle filename collisions by appending counter, resuming at the
+        # last counter used for this name instead of probing from 1 again
+        name, stem, suffix = file.name, file.stem, file.suffix
+        counter_key = (archive_folder, name)
+        counter = self._collision_counters.get(counter_key, 0)
+        while True:
+            if counter:
+                name = f"{stem}_{counter}{suffix}"
+            archive_path = archive_folder / name
+            try:
+                self._rename_no_replace(file, archive_path)
+            except FileExistsError:
+                counter += 1
+                continue
+            except FileNotFoundError:
+                # Archive folder was removed during the session, create it again
+                if file.exists() and not archive_folder.exists():
+                    archive_folder.mkdir()
+                    continue
+                raise
+            self._collision_counters[counter_key] = counter
+            return archive_path
+    
+    @staticmethod
+    def _rename_no_replace(src, dst):
+        """Rename src to dst atomically, raising FileExistsError if dst exists"""
+        try:
+            if os.name == 'nt':
+                # Windows rename never replaces an existing file
+                os.rename(src, dst)
+                return
+            # A hard link fails with EEXIST instead of overwriting
+            os.link(src, dst)
+        except (FileExistsError, FileNotFoundError):
+            raise
+        except OSError:
+            # No hard links (e.g. FAT) or another device (EXDEV): check, then
+            # move with shutil, which falls back to copy + delete
+            if os.path.lexists(dst):
+                raise FileExistsError(dst)
+            shutil.move(src, dst)
+            return
+        os.unlink(src)
+    
+    def _ensure_archive_folder(self, archive_folder):
+        """Create archive folder once per session"""
+        if archive_folder not in self._archive_folders:
+            archive_folder.mkdir(exist_ok=True)
+            self._archive_folders.add(archive_folder)
+    
     def _archive_related_files(self, original_image_path, archive_folder):
         """Archive files with same stem but different extension"""
-        original_image_path = Path(original_image_path)
-        parent_dir = original_image_path.parent
+        for file in self._find_related_files(original_image_path):
+            try:
+                self._move_to_archive(file, archive_folder)
+            except Exception as e:
+                # Continue with other related files if one fails
+                if self.translator:
+                    print(f"Warning: Could not archive related file {file.name}: {e}")
+    
+    def _find_related_files(self, original_image_path):
+        """Return files with same stem but different extension in a single directory scan"""
+        if not isinstance(original_image_path, Path):
+            original_image_path = Path(original_image_path)
         stem = original_image_path.stem
+        prefix = stem + "."
+        original_suffix = original_image_path.suffix.lower()
         
-        # Find all files in the same directory with the same stem
-        for file in parent_dir.iterdir():
-            if file.is_file() and file.stem == stem and file.suffix.lower() != original_image_path.suffix.lower():
-                related_archive_path = archive_folder / file.name
-                
-                # Handle filename collisions for related files too
-                counter = 1
-                while related_archive_path.exists():
-                    related_archive_path = archive_folder / f"{file.stem}_{counter}{file.suffix}"
-                    counter += 1
-                
-                try:
-                    file.rename(related_archive_path)
-                except Exception as e:
-                    # Continue with other related files if one fails
-                    if self.translator:
-                        print(f"Warning: Could not archive related file {file.name}: {e}")
+        related_files = []
+        with os.scandir(original_image_path.parent) as entries:
+            for entry in entries:
+                # Cheap string check first, only stat candidates
+                if not entry.name.startswith(prefix):
+                    continue
+                root, suffix = os.path.splitext(entry.name)
+                if root == stem and suffix.lower() != original_suffix and entry.is_file():
+                    related_files.append(Path(entry.path))
+        return related_files
+    
+    def _find_related_files_batch(self, image_paths):
+        """Map each image to its related files, scanning every directory only once
+        
+        Files that are part of the batch themselves are not reported as related,
+        and a file shared by several images (e.g. one .xmp) is only reported once.
+        """
+        claimed = set(image_paths)
+        images_by_folder = {}
+        for image_path in image_paths:
+            images_by_folder.setdefault(image_path.parent, []).append(image_path)
+        
+        related = {}
+        for folder, folder_images in images_by_folder.items():
+            stems = {image_path.stem for image_path in folder_images}
+            files_by_stem = {}
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    root = os.path.splitext(entry.name)[0]
+                    if root in stems and entry.is_file():
+                        files_by_stem.setdefault(root, []).append(Path(entry.path))
+            for image_path in folder_images:
+                suffix = image_path.suffix.lower()
+                related[image_path] = [file for file in files_by_stem.get(image_path.stem, ())
+                                       if file.suffix.lower() != suffix and file not in claimed]
+                claimed.update(related[image_path])
+        return related
     
     def delete_image(self, image_path, parent_widget=None, translator=None, delete_related_files=False):
         """Delete image with confirmation dialog"""
         try:
-            image_path = Path(image_path)
+            if not isinstance(image_path, Path):
+                image_path = Path(image_path)
             
             # Show confirmation dialog
             if parent_widget and self.translator:
@@ -119,18 +228,44 @@ class FileManager:
                 )
             return False
     
-    def _delete_related_files(self, original_image_path):
-        """Delete files with same stem but different extension"""
-        original_image_path = Path(original_image_path)
-        parent_dir = original_image_path.parent
-        stem = original_image_path.stem
+    def delete_batch(self, image_paths, delete_related_files=False):
+        """Delete several images at once without dialogs
+        
+        Returns (deleted, failed): the image paths that were deleted and
+        (path, error) pairs of images and related files that could not be deleted.
+        """
+        image_paths = [Path(image_path) for image_path in image_paths]
+        related = self._find_related_files_batch(image_paths) if delete_related_files else {}
+        deleted = []
+        failed = []
         
-        # Find all files in the same directory with the same stem
-        for file in parent_dir.iterdir():
-            if file.is_file() and file.stem == stem and file.suffix.lower() != original_image_path.suffix.lower():
+        for image_path in image_paths:
+            try:
+                image_path.unlink()
+            except Exception as e:
+                failed.append((image_path, e))
+                continue
+            deleted.append(image_path)
+            
+            for file in related.get(image_path, ()):
                 try:
                     file.unlink()
                 except Exception as e:
-                    # Continue with other related files if one fails
-                    if self.translator:
-                        print(f"Warning: Could not delete related file {file.name}: {e}")
+                    failed.append((file, e))
+        
+        return deleted, failed
+    
+    @staticmethod
+    def format_failures(failed):
+        """Format (path, error) pairs of a batch operation as one line per file"""
+        return "\n".join(f"{path.name}: {error}" for path, error in failed)
+    
+    def _delete_related_files(self, original_image_path):
+        """Delete files with same stem but different extension"""
+        for file in self._find_related_files(original_image_path):
+            try:
+                file.unlink()
+            except Exception as e:
+                # Continue with other related files if one fails
+                if self.translator:
+                    print(f"Warning: Could not delete related file {file.name}: {e}")
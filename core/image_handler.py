@@ -1,36 +1,104 @@
 """Image handling and display functionality for GuckMohl"""
+import os
 from pathlib import Path
-from PIL import Image, ImageQt
-from PySide6.QtGui import QPixmap
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, QImageReader, QPixmap, QPixmapCache
+from PySide6.QtCore import Qt, QObject, QRunnable, QSize, QThreadPool, Signal
+
+from core.thumbnail_cache import ThumbnailCache
+
+
+class PrefetchSignals(QObject):
+    """Signals to hand prefetched images back to the GUI thread"""
+    image_decoded = Signal(object, QImage, bool, object)  # Path, image, reduced, file mtime_ns
+    image_failed = Signal(object)
+    image_cached = Signal(object)  # Emitted once a background decode is in the pixmap cache
+
+
+class PrefetchWorker(QRunnable):
+    """Decodes an image in a worker thread"""
+    
+    def __init__(self, image_path, decode, target_size, signals, thumbnail_cache=None):
+        super().__init__()
+        self.image_path = image_path
+        self.decode = decode
+        self.target_size = target_size
+        self.signals = signals
+        self.thumbnail_cache = thumbnail_cache
+    
+    def run(self):
+        try:
+            # Taken before decoding, so a later edit of the file is never missed
+            mtime_ns = os.stat(self.image_path).st_mtime_ns
+            qimage, reduced = self.decode(self.image_path, self.target_size)
+        except Exception:
+            self.signals.image_failed.emit(self.image_path)
+            return
+        self.signals.image_decoded.emit(self.image_path, qimage, reduced, mtime_ns)
+        # Encode the disk thumbnail only once the image is on its way to the display
+        if self.thumbnail_cache:
+            self.thumbnail_cache.store(self.image_path, qimage)
 
 
 class ImageHandler:
     """Handles image loading, display, and manipulation"""
     
-    SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
+    SUPPORTED_FORMATS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'})
+    QT_NATIVE_FORMATS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'})  # Decoded without PIL
+    # Supported extensions grouped by length (including the dot) to reject other names early
+    FORMATS_BY_LENGTH = {
+        4: frozenset({'.jpg', '.png', '.gif', '.bmp'}),
+        5: frozenset({'.jpeg', '.tiff', '.webp'}),
+    }
+    PIXMAP_CACHE_LIMIT_KB = 256 * 1024  # 256 MB for decoded images
+    SYNC_DECODE_MAX_PIXELS = 1_000_000  # Smaller images are decoded right away without a preview
+    CURRENT_DECODE_PRIORITY = 1  # Thread pool queue priority above neighbour prefetches (0)
     
     def __init__(self):
         self.image_files = []
         self.current_index = 0
         self.current_pixmap = None
-        self.marked_images = set()  # Store marked image paths
+        self.marked_images = {}  # Normalized path string -> marked image path
+        self._pixmap_keys = {}  # Image path -> (file mtime_ns, QPixmapCache.Key) of decoded pixmap
+        self._reduced_images = set()  # Cached pixmaps decoded below full resolution
+        self.display_size = None  # Last widget size images were decoded for
+        self.showing_preview = False  # current_pixmap is a stand-in until the decode is done
+        self.thumbnail_cache = ThumbnailCache()
+        QPixmapCache.setCacheLimit(self.PIXMAP_CACHE_LIMIT_KB)
+        
+        # Neighbour prefetching; QPixmapCache is only touched on the GUI thread
+        self._prefetching = {}  # Image path -> (worker, priority) of queued or running decodes
+        self._prefetch_signals = PrefetchSignals()
+        self._prefetch_signals.image_decoded.connect(self._on_image_prefetched)
+        self._prefetch_signals.image_failed.connect(self._on_prefetch_failed)
+        self.image_cached = self._prefetch_signals.image_cached
+        self.image_failed = self._prefetch_signals.image_failed
     
     def load_images_from_folder(self, folder_path):
         """Load all supported image files from a folder"""
         self.image_files = []
-        folder = Path(folder_path)
         
-        # Scan directory for supported image files
-        for file in folder.iterdir():
-            if file.is_file() and file.suffix.lower() in self.SUPPORTED_FORMATS:
-                self.image_files.append(file)
+        formats_by_length = self.FORMATS_BY_LENGTH
+        
+        # Scan directory for supported image files (DirEntry caches the file type)
+        with os.scandir(folder_path) as entries:
+            for entry in entries:
+                # Check the extension with plain string ops before touching the file type
+                name = entry.name
+                dot = name.rfind('.')
+                if dot <= 0:
+                    continue
+                # Only lowercase extensions whose length matches a supported format
+                formats = formats_by_length.get(len(name) - dot)
+                if formats and name[dot:].lower() in formats and entry.is_file():
+                    self.image_files.append(Path(entry.path))
         
-        # Sort files alphabetically for consistent navigation
-        self.image_files.sort()
+        # Sort files alphabetically (case-insensitive) for consistent navigation,
+        # comparing plain strings instead of Path objects
+        self.image_files.sort(key=lambda path: path.name.lower())
         
         if self.image_files:
             self.current_index = 0
+            self.prefetch_neighbors()
         
         return self.image_files
     
@@ -40,59 +108,305 @@ class ImageHandler:
             return None
         return self.image_files[self.current_index]
     
-    def open_image(self, image_path):
-        """Load and prepare image for display"""
+    def open_image(self, image_path, target_size=None):
+        """Load and prepare image for display, reusing cached pixmaps
+        
+        With target_size, JPEGs may be decoded at a reduced scale that still
+        covers the target, so only geometry is reduced and never below display size.
+        """
+        self._set_display_size(target_size)
+        self.showing_preview = False
+        
+        pixmap = self._cached_pixmap(image_path)
+        if pixmap is not None:
+            if image_path not in self._reduced_images or self._covers(pixmap, target_size):
+                self.current_pixmap = pixmap
+                return self.current_pixmap
+            # Too small for the target
+            self._forget_pixmap(image_path)
+        
         try:
-            pil_image = Image.open(str(image_path))
-            pil_image = self.correct_image_orientation(pil_image)
-            self.current_pixmap = QPixmap.fromImage(ImageQt.ImageQt(pil_image))
+            mtime_ns = os.stat(image_path).st_mtime_ns
+            qimage, reduced = self.decode_image(image_path, target_size)
+            self.current_pixmap = QPixmap.fromImage(qimage)
+            self._cache_pixmap(image_path, self.current_pixmap, reduced, mtime_ns)
+            # Write the disk thumbnail without blocking the GUI thread
+            QThreadPool.globalInstance().start(lambda: self.thumbnail_cache.store(image_path, qimage))
             return self.current_pixmap
         except Exception as e:
+            # Never leave the previous image as the current one
+            self.current_pixmap = None
             raise Exception(f"Error loading image: {str(e)}")
     
+    def decode_image(self, image_path, target_size=None):
+        """Decode image with corrected orientation into a QImage (thread-safe)
+        
+        Returns (qimage, reduced) where reduced tells if the decode was downscaled.
+        The QImage owns its pixel buffer, so it can be handed to other threads.
+        """
+        if Path(image_path).suffix.lower() in self.QT_NATIVE_FORMATS:
+            result = self._decode_with_qt(image_path, target_size)
+            if result is not None:
+                return result
+        
+        # PIL is imported on first use to keep it out of application startup
+        from PIL import Image
+        # Close the file right away, multi-frame formats like TIFF keep it open otherwise
+        with Image.open(str(image_path)) as pil_image:
+            full_size = pil_image.size
+            if target_size is not None and pil_image.format == "JPEG":
+                # Let libjpeg downscale during decode; use the longest side on both
+                # axes so the result still covers the target after rotation
+                side = max(target_size.width(), target_size.height())
+                pil_image.draft("RGB", (side, side))
+            reduced = pil_image.size != full_size
+            pil_image = self.correct_image_orientation(pil_image)
+            return self.pil_to_qimage(pil_image), reduced
+    
+    @staticmethod
+    def pil_to_qimage(pil_image):
+        """Convert a PIL image into a QImage that owns its pixel buffer (thread-safe)"""
+        # Wrap the raw buffer directly instead of going through ImageQt
+        if pil_image.mode == "RGB":
+            image_format, bytes_per_pixel = QImage.Format.Format_RGB888, 3
+        else:
+            pil_image = pil_image.convert("RGBA")
+            image_format, bytes_per_pixel = QImage.Format.Format_RGBA8888, 4
+        data = pil_image.tobytes()
+        # The QImage only borrows data, copy it so the buffer outlives this call
+        return QImage(data, pil_image.width, pil_image.height,
+                      pil_image.width * bytes_per_pixel, image_format).copy()
+    
+    def _decode_with_qt(self, image_path, target_size):
+        """Decode with QImageReader, which applies EXIF orientation in C++
+        
+        Returns None if Qt cannot read the file so the PIL path can try.
+        """
+        reader = QImageReader(str(image_path))
+        reader.setAutoTransform(True)
+        
+        reduced = False
+        size = reader.size()
+        if target_size is not None and size.isValid():
+            # Shrink uniformly so both sides still cover the longest target
+            # side, whatever the orientation (JPEG scales during decode)
+            side = max(target_size.width(), target_size.height())
+            factor = side / min(size.width(), size.height())
+            if factor < 1:
+                reader.setScaledSize(QSize(round(size.width() * factor), round(size.height() * factor)))
+                reduced = True
+        
+        qimage = reader.read()
+        if qimage.isNull():
+            return None
+        return qimage, reduced
+    
+    def _cache_pixmap(self, image_path, pixmap, reduced, mtime_ns):
+        """Insert pixmap into QPixmapCache and remember its key with the file version it shows"""
+        self._pixmap_keys[image_path] = (mtime_ns, QPixmapCache.insert(pixmap))
+        if reduced:
+            self._reduced_images.add(image_path)
+    
+    def _cached_pixmap(self, image_path):
+        """Return the cached pixmap of an image, None if evicted or the file changed since"""
+        entry = self._pixmap_keys.get(image_path)
+        if entry is None:
+            return None
+        mtime_ns, key = entry
+        pixmap = QPixmapCache.find(key)
+        try:
+            current = pixmap is not None and os.stat(image_path).st_mtime_ns == mtime_ns
+        except OSError:
+            current = False
+        if not current:
+            self._forget_pixmap(image_path)
+            return None
+        return pixmap
+    
+    @staticmethod
+    def _covers(pixmap, target_size):
+        """Check if pixmap can be fitted into target_size without upscaling"""
+        if target_size is None:
+            return False
+        return pixmap.width() >= target_size.width() or pixmap.height() >= target_size.height()
+    
+    def is_image_cached(self, image_path):
+        """Check if a decoded pixmap of the current file version is cached"""
+        return self._cached_pixmap(image_path) is not None
+    
+    def open_preview(self, image_path, target_size=None):
+        """Show a stand-in for an image while it is decoded in the background
+        
+        The disk thumbnail is used if there is one. Otherwise, if a worker is
+        already decoding the image (e.g. a neighbour prefetch), current_pixmap is
+        None until it is done instead of decoding the image a second time; the
+        previous image never stands in for it.
+        Returns False if the image has to be decoded now.
+        image_cached (or image_failed) is emitted once the decode is done.
+        """
+        self._set_display_size(target_size)
+        # Small images decode faster than a preview round trip (reads the header only)
+        size = QImageReader(str(image_path)).size()
+        if size.isValid() and size.width() * size.height() <= self.SYNC_DECODE_MAX_PIXELS:
+            return False
+        
+        qimage = self.thumbnail_cache.load(image_path)
+        if qimage is not None:
+            self.current_pixmap = QPixmap.fromImageInPlace(qimage)
+        elif image_path in self._prefetching:
+            self.current_pixmap = None
+        else:
+            return False
+        self.showing_preview = True
+        self._decode_in_background(image_path, self.CURRENT_DECODE_PRIORITY)
+        return True
+    
+    def _set_display_size(self, target_size):
+        """Remember the size images are decoded for, warming up the neighbours once it is known"""
+        if target_size is None:
+            return
+        first_size = self.display_size is None
+        self.display_size = target_size
+        if first_size:
+            self.prefetch_neighbors()
+    
+    def prefetch(self, index):
+        """Decode image at index in the background so navigation hits the cache
+        
+        Nothing is prefetched before the display size is known, see _set_display_size.
+        """
+        if self.display_size is not None and 0 <= index < len(self.image_files):
+            self._decode_in_background(self.image_files[index])
+    
+    def _decode_in_background(self, image_path, priority=0):
+        """Start a worker decode unless the image is cached or already queued
+        
+        Queued workers with a higher priority are started first. A decode that
+        is still queued with a lower priority is moved up to the new one.
+        """
+        if self._cached_pixmap(image_path) is not None:
+            return
+        queued = self._prefetching.get(image_path)
+        if queued is not None:
+            if queued[1] < priority:
+                self._requeue(image_path, priority)
+            return
+        
+        worker = PrefetchWorker(image_path, self.decode_image, self.display_size,
+                                self._prefetch_signals, self.thumbnail_cache)
+        self._prefetching[image_path] = (worker, priority)
+        QThreadPool.globalInstance().start(worker, priority)
+    
+    def _requeue(self, image_path, priority):
+        """Queue a decode again with another priority, or drop it if priority is None
+        
+        Returns False if the worker is already running, it is done soon then anyway.
+        """
+        worker = self._prefetching[image_path][0]
+        pool = QThreadPool.globalInstance()
+        try:
+            if not pool.tryTake(worker):
+                return False
+        except RuntimeError:
+            # Finished and deleted by the pool, its result is on the way to the GUI thread
+            return False
+        if priority is None:
+            del self._prefetching[image_path]
+        else:
+            self._prefetching[image_path] = (worker, priority)
+            pool.start(worker, priority)
+        return True
+    
+    def prefetch_neighbors(self):
+        """Prefetch the images next to the current one
+        
+        Queued decodes are reordered so the current image goes first, and
+        decodes of images that are no longer next to it are dropped.
+        """
+        current = self.get_current_image_path()
+        neighbours = self.image_files[max(self.current_index - 1, 0):self.current_index + 2]
+        for image_path, (_, priority) in list(self._prefetching.items()):
+            if image_path == current:
+                if priority < self.CURRENT_DECODE_PRIORITY:
+                    self._requeue(image_path, self.CURRENT_DECODE_PRIORITY)
+            elif image_path not in neighbours:
+                self._requeue(image_path, None)
+            elif priority > 0:
+                # The previous current image, it must not hold up the new one
+                self._requeue(image_path, 0)
+        
+        self.prefetch(self.current_index + 1)
+        self.prefetch(self.current_index - 1)
+    
+    def _on_image_prefetched(self, image_path, qimage, reduced, mtime_ns):
+        """Store a prefetched image in the pixmap cache (GUI thread)
+        
+        The worker is done with the QImage, so the pixmap takes over its buffer.
+        """
+        self._prefetching.pop(image_path, None)
+        # Skip images removed or already loaded in the meantime
+        if image_path not in self.image_files or self._cached_pixmap(image_path) is not None:
+            return
+        self._cache_pixmap(image_path, QPixmap.fromImageInPlace(qimage), reduced, mtime_ns)
+        self.image_cached.emit(image_path)
+    
+    def _on_prefetch_failed(self, image_path):
+        """Forget a background decode that failed (GUI thread)"""
+        self._prefetching.pop(image_path, None)
+    
     def correct_image_orientation(self, image):
         """Correct image orientation based on EXIF tag 274 (Orientation)"""
+        from PIL import ImageOps
         try:
-            exif = image.getexif()
-            orientation = exif.get(274, 1)  # Tag 274 = Orientation, default = 1 (normal)
-            
-            # Handle all 8 EXIF orientation values
-            if orientation == 2:  # Horizontal flip
-                image = image.transpose(Image.FLIP_LEFT_RIGHT)
-            elif orientation == 3:  # 180 degree rotation
-                image = image.rotate(180, expand=True)
-            elif orientation == 4:  # Vertical flip
-                image = image.transpose(Image.FLIP_TOP_BOTTOM)
-            elif orientation == 5:  # Horizontal flip + 90 CW rotation
-                image = image.transpose(Image.FLIP_LEFT_RIGHT)
-                image = image.rotate(90, expand=True)
-            elif orientation == 6:  # 90 CW rotation
-                image = image.rotate(270, expand=True)
-            elif orientation == 7:  # Horizontal flip + 270 CW rotation
-                image = image.transpose(Image.FLIP_LEFT_RIGHT)
-                image = image.rotate(270, expand=True)
-            elif orientation == 8:  # 270 CW rotation
-                image = image.rotate(90, expand=True)
+            # One transpose for each of the 8 orientations, done in place so upright
+            # images are not copied. Unlike a plain tag lookup, this also sees that
+            # libtiff has already applied the orientation while decoding a TIFF.
+            ImageOps.exif_transpose(image, in_place=True)
         except (AttributeError, KeyError, IndexError):
             pass
         
         return image
     
-    def scale_pixmap_for_display(self, widget_size):
-        """Scale current pixmap to fit widget while maintaining aspect ratio"""
+    def scale_pixmap_for_display(self, widget_size, pixel_ratio=1.0):
+        """Scale current pixmap to fit widget while maintaining aspect ratio
+        
+        The result has pixel_ratio device pixels per widget pixel so it stays
+        sharp on high-DPI screens.
+        """
+        target_size = widget_size * pixel_ratio
+        image_path = self.get_current_image_path()
+        if (image_path in self._reduced_images and self.current_pixmap
+                and not self._covers(self.current_pixmap, target_size)):
+            # Widget grew beyond the reduced decode, decode again at the new size
+            try:
+                self.open_image(image_path, target_size)
+            except Exception:
+                pass
         if self.current_pixmap and not self.current_pixmap.isNull():
-            scaled_pixmap = self.current_pixmap.scaled(
-                widget_size,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            return scaled_pixmap
+            # Scaled pixmaps share QPixmapCache with decoded ones, so revisiting an
+            # image at the same size (or toggling its mark) needs no rescale
+            scale_key = (f"scaled:{self.current_pixmap.cacheKey()}:"
+                         f"{target_size.width()}x{target_size.height()}@{pixel_ratio}")
+            scaled_pixmap = QPixmapCache.find(scale_key)
+            if scaled_pixmap is None:
+                scaled_pixmap = self.current_pixmap.scaled(
+                    target_size,
+                    Qt.AspectRatioMode.KeepAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation
+                )
+                scaled_pixmap.setDevicePixelRatio(pixel_ratio)
+                # Previews are replaced shortly and never looked up again
+                if not self.showing_preview:
+                    QPixmapCache.insert(scale_key, scaled_pixmap)
+            # Hand out a shallow copy so painting on it does not alter the cached one
+            return QPixmap(scaled_pixmap)
         return None
     
     def next_image(self):
         """Move to next image"""
         if self.image_files and self.current_index < len(self.image_files) - 1:
             self.current_index += 1
+            self.prefetch_neighbors()
             return True
         return False
     
@@ -100,6 +414,7 @@ class ImageHandler:
         """Move to previous image"""
         if self.image_files and self.current_index > 0:
             self.current_index -= 1
+            self.prefetch_neighbors()
             return True
         return False
     
@@ -123,48 +438,86 @@ class ImageHandler:
         """Check if any images are loaded"""
         return len(self.image_files) > 0
     
+    def state_snapshot(self):
+        """Return (has_images, can_go_previous, can_go_next, marked_count, current_marked) as one tuple"""
+        count = len(self.image_files)
+        if not count:
+            return False, False, False, len(self.marked_images), False
+        index = self.current_index
+        current_marked = index < count and self._mark_key(self.image_files[index]) in self.marked_images
+        return True, index > 0, index < count - 1, len(self.marked_images), current_marked
+    
     def remove_current_image(self):
         """Remove current image from list"""
         if self.image_files and self.current_index < len(self.image_files):
             removed_image = self.image_files.pop(self.current_index)
             # Remove from marked images if it was marked
-            self.marked_images.discard(removed_image)
+            self.marked_images.pop(self._mark_key(removed_image), None)
+            self._forget_pixmap(removed_image)
             
             # Adjust index if necessary
             if self.current_index >= len(self.image_files) and self.image_files:
                 self.current_index = len(self.image_files) - 1
             
+            # The neighbours changed, warm up the new ones
+            self.prefetch_neighbors()
             return True
         return False
     
+    def _forget_pixmap(self, image_path):
+        """Drop cached pixmap of an image that left the list or changed on disk"""
+        self._reduced_images.discard(image_path)
+        entry = self._pixmap_keys.pop(image_path, None)
+        if entry is not None:
+            QPixmapCache.remove(entry[1])
+    
+    def remove_images(self, image_paths):
+        """Remove several images from list, keeping the current position"""
+        removed = set(image_paths)
+        if not removed:
+            return False
+        
+        # Shift index back by the number of removed images before it
+        removed_before = sum(1 for path in self.image_files[:self.current_index] if path in removed)
+        self.image_files = [path for path in self.image_files if path not in removed]
+        for image_path in removed:
+            self.marked_images.pop(self._mark_key(image_path), None)
+            self._forget_pixmap(image_path)
+        
+        self.current_index = max(0, min(self.current_index - removed_before, len(self.image_files) - 1))
+        self.prefetch_neighbors()
+        return True
+    
+    @staticmethod
+    def _mark_key(image_path):
+        """Return the normalized string used to look up marked images"""
+        return os.path.normcase(os.fspath(image_path))
+    
     def toggle_mark_current_image(self):
         """Toggle mark status for current image"""
         image_path = self.get_current_image_path()
         if image_path:
-            if image_path in self.marked_images:
-                self.marked_images.remove(image_path)
+            key = self._mark_key(image_path)
+            if key in self.marked_images:
+                del self.marked_images[key]
                 return False
             else:
-                self.marked_images.add(image_path)
+                self.marked_images[key] = image_path
                 return True
         return None
     
     def is_current_image_marked(self):
         """Check if current image is marked"""
         image_path = self.get_current_image_path()
-        return image_path in self.marked_images if image_path else False
+        return self._mark_key(image_path) in self.marked_images if image_path else False
     
     def get_marked_images(self):
         """Return list of marked image paths"""
-        return sorted(list(self.marked_images))
+        return sorted(self.marked_images.values())
     
     def unmark_image(self, image_path):
         """Remove specific image from marked images"""
-        image_path = Path(image_path) if not isinstance(image_path, Path) else image_path
-        if image_path in self.marked_images:
-            self.marked_images.discard(image_path)
-            return True
-        return False
+        return self.marked_images.pop(self._mark_key(image_path), None) is not None
     
     def clear_marked_images(self):
         """Clear all marked images"""
@@ -1,6 +1,13 @@
 """Settings management for GuckMohl application"""
 import json
+import os
 from pathlib import Path
+from PySide6.QtCore import QCoreApplication, QTimer
+
+try:
+    import orjson  # Optional, faster JSON parsing and serialization
+except ImportError:
+    orjson = None
 
 
 class SettingsManager:
@@ -12,22 +19,35 @@ class SettingsManager:
         'archive_related_files': False,
         'delete_related_files': False
     }
+    SAVE_DELAY_MS = 500  # Coalesce changes made in quick succession into one write
     
     def __init__(self):
         """Initialize settings manager and load settings from file"""
         self.settings_dir = Path.home() / '.guckmohl'
         self.settings_file = self.settings_dir / 'settings.json'
         self.settings = self.DEFAULT_SETTINGS.copy()
+        self._dirty = False
+        self._save_timer = None
         self.load_settings()
     
     def load_settings(self):
         """Load settings from JSON file, create default if doesn't exist"""
         try:
             if self.settings_file.exists():
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    loaded = json.load(f)
-                    # Merge with defaults to handle missing keys
-                    self.settings = {**self.DEFAULT_SETTINGS, **loaded}
+                with open(self.settings_file, 'rb') as f:
+                    data = f.read()
+                try:
+                    loaded = orjson.loads(data) if orjson else json.loads(data)
+                    if not isinstance(loaded, dict):
+                        raise ValueError("settings must be a JSON object")
+                except ValueError as e:
+                    # Corrupt or partially written file, start over with defaults
+                    print(f"Invalid settings file, restoring defaults: {e}")
+                    self.settings = self.DEFAULT_SETTINGS.copy()
+                    self.save_settings()
+                    return
+                # Merge with defaults to handle missing keys
+                self.settings = {**self.DEFAULT_SETTINGS, **loaded}
             else:
                 # Create settings directory and file with defaults
                 self.settings_dir.mkdir(parents=True, exist_ok=True)
@@ -37,27 +57,65 @@ class SettingsManager:
             self.settings = self.DEFAULT_SETTINGS.copy()
     
     def save_settings(self):
-        """Save current settings to JSON file"""
+        """Save current settings to JSON file atomically"""
+        self._dirty = False
+        if self._save_timer is not None:
+            self._save_timer.stop()
         try:
             self.settings_dir.mkdir(parents=True, exist_ok=True)
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=2, ensure_ascii=False)
+            # Write to a temporary file first so a crash never leaves a truncated file
+            tmp_file = self.settings_file.with_suffix('.json.tmp')
+            if orjson:
+                data = orjson.dumps(self.settings, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(self.settings, indent=2, ensure_ascii=False).encode('utf-8')
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+                # Make the data durable before the rename, or a power loss can leave an empty file
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.settings_file)
         except Exception as e:
             print(f"Error saving settings: {e}")
     
+    def flush(self):
+        """Write pending changes to file immediately"""
+        if self._dirty:
+            self.save_settings()
+    
+    def _schedule_save(self):
+        """Mark settings as changed and save them after a short delay"""
+        app = QCoreApplication.instance()
+        if app is None:
+            # No event loop to run the timer, save right away
+            self.save_settings()
+            return
+        
+        self._dirty = True
+        if self._save_timer is None:
+            self._save_timer = QTimer()
+            self._save_timer.setSingleShot(True)
+            self._save_timer.timeout.connect(self.flush)
+            # Never lose pending changes on exit
+            app.aboutToQuit.connect(self.flush)
+        self._save_timer.start(self.SAVE_DELAY_MS)
+    
     def get(self, key, default=None):
         """Get a setting value by key"""
         return self.settings.get(key, default)
     
     def set(self, key, value):
-        """Set a setting value and save to file"""
-        self.settings[key] = value
-        self.save_settings()
+        """Set a setting value and schedule saving to file if it changed"""
+        self.update({key: value})
     
     def update(self, settings_dict):
-        """Update multiple settings at once and save to file"""
-        self.settings.update(settings_dict)
-        self.save_settings()
+        """Update multiple settings at once and schedule one save if any changed"""
+        changed = {key: value for key, value in settings_dict.items()
+                   if key not in self.settings or self.settings[key] != value}
+        if not changed:
+            return  # Nothing new, e.g. settings dialog accepted without edits
+        self.settings.update(changed)
+        self._schedule_save()
     
     def get_all(self):
         """Get all settings as a dictionary"""
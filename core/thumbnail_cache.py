@@ -0,0 +1,123 @@
+"""On-disk thumbnail cache for GuckMohl"""
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from PySide6.QtGui import QImage, QImageWriter
+from PySide6.QtCore import Qt, QStandardPaths
+
+
+class ThumbnailCache:
+    """Stores pre-scaled thumbnails on disk, keyed by image path and modification time"""
+    
+    THUMBNAIL_SIZE = 512
+    CACHE_SIZE_LIMIT = 256 * 1024 * 1024  # Bytes on disk, least recently used thumbnails are removed first
+    PRUNE_INTERVAL = 100  # Thumbnails stored between checks of the cache size
+    
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            cache_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+            cache_dir = Path(cache_dir) if cache_dir else Path.home() / '.cache' / 'GuckMohl'
+        self.cache_dir = Path(cache_dir)
+        # Prefer WebP, fall back to JPEG if the Qt build lacks the plugin
+        supported = {bytes(fmt).decode() for fmt in QImageWriter.supportedImageFormats()}
+        self.format = 'webp' if 'webp' in supported else 'jpg'
+        # Check the size with the first store of a session, then every PRUNE_INTERVAL stores
+        self._stores_until_prune = 1
+        self._prune_lock = threading.Lock()
+    
+    def thumbnail_path(self, image_path):
+        """Return cache file path for an image, None if the image is not accessible"""
+        try:
+            mtime_ns = os.stat(image_path).st_mtime_ns
+        except OSError:
+            return None
+        digest = hashlib.sha1(f"{os.fspath(image_path)}:{mtime_ns}".encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{digest}.{self.format}"
+    
+    def load(self, image_path):
+        """Load cached thumbnail as QImage, None if not cached"""
+        thumbnail_path = self.thumbnail_path(image_path)
+        if thumbnail_path is None or not thumbnail_path.exists():
+            return None
+        qimage = QImage(str(thumbnail_path))
+        if qimage.isNull():
+            return None
+        try:
+            # The modification time tells prune() which thumbnails were used last
+            os.utime(thumbnail_path)
+        except OSError:
+            pass
+        return qimage
+    
+    def store(self, image_path, qimage):
+        """Save a scaled-down copy of qimage as thumbnail (thread-safe)"""
+        thumbnail_path = self.thumbnail_path(image_path)
+        if thumbnail_path is None or thumbnail_path.exists():
+            return
+        tmp_name = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            thumbnail = qimage.scaled(
+                self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            )
+            # Write to a temporary file of this writer so readers never see partial
+            # files and two threads storing the same image do not write into one file
+            fd, tmp_name = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+            os.close(fd)
+            if thumbnail.save(tmp_name, self.format):
+                os.replace(tmp_name, thumbnail_path)
+                tmp_name = None
+        except Exception as e:
+            print(f"Warning: Could not store thumbnail for {image_path}: {e}")
+        finally:
+            if tmp_name is not None:
+                try:
+                    os.remove(tmp_name)
+                except OSError:
+                    pass
+        
+        with self._prune_lock:
+            self._stores_until_prune -= 1
+            if self._stores_until_prune > 0:
+                return
+            self._stores_until_prune = self.PRUNE_INTERVAL
+        self.prune()
+    
+    def prune(self):
+        """Remove the least recently used thumbnails while the cache exceeds CACHE_SIZE_LIMIT
+        
+        This also removes thumbnails of images that changed since, which are never looked up again.
+        """
+        # Only thumbnails and temporary files, the cache folder may be shared with Qt
+        suffixes = (f".{self.format}", '.tmp')
+        files = []
+        total_size = 0
+        try:
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith(suffixes):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_size += stat.st_size
+        except OSError:
+            return
+        if total_size <= self.CACHE_SIZE_LIMIT:
+            return
+        
+        files.sort()
+        for _, size, path in files:
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total_size -= size
+            if total_size <= self.CACHE_SIZE_LIMIT:
+                break
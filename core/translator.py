@@ -1,7 +1,23 @@
 """Translation and localization management for GuckMohl"""
+import functools
 import json
+import sys
 from pathlib import Path
 
+try:
+    import orjson  # Optional, faster JSON parsing
+except ImportError:
+    orjson = None
+
+LANG_DIR = Path(__file__).parent.parent / "lang"  # Translation catalogs <code>.json
+
+
+class _FormatArgs(dict):
+    """Format arguments that keep unknown placeholders instead of raising"""
+    
+    def __missing__(self, key):
+        return "{" + key + "}"
+
 
 class Translator:
     """Manages translation and language selection"""
@@ -9,6 +25,8 @@ class Translator:
     def __init__(self, default_language="en"):
         self.current_language = default_language
         self.translations = {}
+        # Formatted results per (key, kwargs), cleared on language change
+        self._format_cached = functools.lru_cache(maxsize=512)(self._format)
         self.available_languages = {
             "en": "English",
             "de": "Deutsch",
@@ -16,29 +34,53 @@ class Translator:
             "es": "Español",
             "zh_CN": "简体中文"
         }
+        # Parse all catalogs once so switching languages needs no disk I/O
+        self._catalogs = {}
+        for lang_file in LANG_DIR.glob("*.json"):
+            try:
+                self._catalogs[lang_file.stem] = self._read_catalog(lang_file)
+            except Exception as e:
+                print(f"Error loading language file {lang_file}: {e}")
         self.load_language(default_language)
     
+    def _read_catalog(self, lang_file):
+        """Parse a translation file into a dict with interned keys"""
+        with open(lang_file, 'rb') as f:
+            data = f.read()
+        catalog = orjson.loads(data) if orjson else json.loads(data)
+        # Intern keys so lookups with literal keys compare by identity
+        return {sys.intern(key): text for key, text in catalog.items()}
+    
     def load_language(self, lang_code):
-        """Load the translation file for the specified language"""
-        lang_file = Path(__file__).parent.parent / "lang" / f"{lang_code}.json"
-        try:
-            with open(lang_file, 'r', encoding='utf-8') as f:
-                self.translations = json.load(f)
-            self.current_language = lang_code
-        except Exception as e:
-            print(f"Error loading language file {lang_file}: {e}")
+        """Switch to the preloaded translations of the specified language"""
+        catalog = self._catalogs.get(lang_code)
+        if catalog is None:
+            print(f"Language {lang_code} is not available")
             # Fallback to English if loading fails
             if lang_code != "en":
                 self.load_language("en")
+            return
+        self.translations = catalog
+        self.current_language = lang_code
+        self._format_cached.cache_clear()
     
     def translate(self, key, **kwargs):
         """Translate a key and format with kwargs placeholders"""
+        if not kwargs:
+            return self.translations.get(key, key)
+        try:
+            return self._format_cached(key, frozenset(kwargs.items()))
+        except TypeError:
+            # Unhashable argument values cannot be cached
+            return self._format(key, kwargs.items())
+    
+    def _format(self, key, items):
+        """Look up key and fill its placeholders from (name, value) items"""
         text = self.translations.get(key, key)
-        if kwargs:
-            try:
-                text = text.format(**kwargs)
-            except KeyError:
-                pass
+        try:
+            text = text.format_map(_FormatArgs(items))
+        except (ValueError, IndexError):
+            pass
         return text
     
     def get_available_languages(self):
@@ -3,25 +3,57 @@ GuckMohl - PySide6 Multilingual Image Viewer
 Refactored main module using separated core and UI components
 """
 import sys
-import json
+from functools import partial
 from pathlib import Path
 from core import __version__
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                                QPushButton, QLabel, QMessageBox, QFileDialog, QSizePolicy, QDialog)
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QAction, QPixmap, QPainter, QColor, QBrush
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QAction, QPixmap, QPainter, QColor, QBrush, QKeySequence, QShortcut
 
 from core.translator import Translator
 from core.image_handler import ImageHandler
 from core.exif_handler import ExifHandler
 from core.file_manager import FileManager
 from core.settings_manager import SettingsManager
-from ui.dialogs import SettingsDialog, CompareDialog
+from ui.image_label import ImageLabel
 
 
 class MainWindow(QMainWindow):
     """Main application window for GuckMohl image viewer"""
     
+    _ICONS = None  # Standard icons by name, see _get_icons
+    # (attribute, setter, translation key) of the texts updated on language change
+    _TRANSLATED_TEXTS = (
+        ('welcome_label', 'setText', 'welcome_message'),
+        ('open_folder_button', 'setText', 'open_folder_button'),
+        ('prev_button', 'setText', 'button_back'),
+        ('prev_button', 'setToolTip', 'tooltip_previous'),
+        ('next_button', 'setText', 'button_forward'),
+        ('next_button', 'setToolTip', 'tooltip_next'),
+        ('archive_button', 'setText', 'button_archive'),
+        ('archive_button', 'setToolTip', 'tooltip_archive'),
+        ('delete_button', 'setText', 'button_delete'),
+        ('delete_button', 'setToolTip', 'tooltip_delete'),
+        ('mark_button', 'setText', 'button_mark'),
+        ('mark_button', 'setToolTip', 'tooltip_mark'),
+        ('compare_button', 'setText', 'button_compare'),
+        ('compare_button', 'setToolTip', 'tooltip_compare'),
+        # Menus and actions are retranslated in place, not rebuilt
+        ('file_menu', 'setTitle', 'menu_file'),
+        ('open_action', 'setText', 'menu_open'),
+        ('exit_action', 'setText', 'menu_exit'),
+        ('mark_menu', 'setTitle', 'menu_mark'),
+        ('mark_action', 'setText', 'button_mark'),
+        ('compare_action', 'setText', 'button_compare'),
+        ('archive_marked_action', 'setText', 'button_archive_marked'),
+        ('delete_marked_action', 'setText', 'button_delete_marked'),
+        ('edit_menu', 'setTitle', 'menu_edit'),
+        ('settings_action', 'setText', 'menu_settings'),
+        ('help_menu', 'setTitle', 'menu_help'),
+        ('about_action', 'setText', 'menu_about'),
+    )
+    
     def __init__(self):
         super().__init__()
         
@@ -32,7 +64,10 @@ class MainWindow(QMainWindow):
         initial_language = self.settings_manager.get('language', 'en')
         self.translator = Translator(initial_language)
         self.image_handler = ImageHandler()
+        self.image_handler.image_cached.connect(self.on_image_cached)
+        self.image_handler.image_failed.connect(self.on_image_failed)
         self.exif_handler = ExifHandler(self.translator)
+        self.exif_handler.rating_read.connect(self.on_rating_read)
         self.file_manager = FileManager(self.translator)
         
         # Load application settings
@@ -52,35 +87,41 @@ class MainWindow(QMainWindow):
         self.mark_button = None
         self.compare_button = None
         self.open_folder_button = None
+        self._compare_dialog = None  # Kept between openings to reuse loaded thumbnails
+        self.current_rating = 0
+        
+        # Rescale once resizing settles, the label stretches its pixmap in between
+        self.resize_timer = QTimer(self)
+        self.resize_timer.setSingleShot(True)
+        self.resize_timer.setInterval(120)
+        self.resize_timer.timeout.connect(self.scale_and_display_image)
+        
+        # Ratings typed in quick succession are written once
+        self.pending_ratings = {}
+        self.rating_timer = QTimer(self)
+        self.rating_timer.setSingleShot(True)
+        self.rating_timer.setInterval(1500)
+        self.rating_timer.timeout.connect(self.flush_ratings)
         
         # Initialize the user interface
         self.init_ui()
     
-    def load_language(self, lang_code):
-        """Load the translation file for the specified language"""
-        lang_file = Path(__file__).parent / "lang" / f"{lang_code}.json"
-        try:
-            with open(lang_file, 'r', encoding='utf-8') as f:
-                self.translations = json.load(f)
-            self.current_language = lang_code
-        except Exception as e:
-            print(f"Error loading language file {lang_file}: {e}")
-            # Fallback to English if loading fails
-            if lang_code != "en":
-                self.load_language("en")
-    
-    def tr(self, key, **kwargs):
-        """Translate a key and format with kwargs placeholders"""
-        text = self.translations.get(key, key)
-        if kwargs:
-            try:
-                text = text.format(**kwargs)
-            except KeyError:
-                pass
-        return text
+    def _get_icons(self):
+        """Return standard icons, created once and shared by all windows"""
+        if MainWindow._ICONS is None:
+            style = self.style()
+            MainWindow._ICONS = {
+                'open': style.standardIcon(style.StandardPixmap.SP_DirOpenIcon),
+                'prev': style.standardIcon(style.StandardPixmap.SP_ArrowLeft),
+                'next': style.standardIcon(style.StandardPixmap.SP_ArrowRight),
+                'save': style.standardIcon(style.StandardPixmap.SP_DialogSaveButton),
+                'trash': style.standardIcon(style.StandardPixmap.SP_TrashIcon),
+            }
+        return MainWindow._ICONS
     
     def init_ui(self):
         """Initialize all UI components and layout"""
+        icons = self._get_icons()
         self.setWindowTitle(self.translator.translate("app_title"))
         self.setGeometry(100, 100, 800, 600)
         
@@ -96,7 +137,7 @@ class MainWindow(QMainWindow):
         central_widget.setLayout(layout)
         
         # Image display label
-        self.image_label = QLabel("")
+        self.image_label = ImageLabel("")
         self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.image_label.setMinimumSize(400, 400)
         self.image_label.setScaledContents(False)
@@ -104,7 +145,7 @@ class MainWindow(QMainWindow):
         
         # Open folder button (welcome screen)
         self.open_folder_button = QPushButton()
-        self.open_folder_button.setIcon(self.style().standardIcon(self.style().StandardPixmap.SP_DirOpenIcon))
+        self.open_folder_button.setIcon(icons['open'])
         self.open_folder_button.setText(self.translator.translate("open_folder_button"))
         self.open_folder_button.clicked.connect(self.open_folder)
         self.open_folder_button.setMinimumSize(200, 50)
@@ -132,7 +173,7 @@ class MainWindow(QMainWindow):
         
         # Previous button
         self.prev_button = QPushButton()
-        self.prev_button.setIcon(self.style().standardIcon(self.style().StandardPixmap.SP_ArrowLeft))
+        self.prev_button.setIcon(icons['prev'])
         self.prev_button.setText(self.translator.translate("button_back"))
         self.prev_button.setToolTip(self.translator.translate("tooltip_previous"))
         self.prev_button.clicked.connect(self.previous_image)
@@ -141,7 +182,7 @@ class MainWindow(QMainWindow):
         
         # Next button
         self.next_button = QPushButton()
-        self.next_button.setIcon(self.style().standardIcon(self.style().StandardPixmap.SP_ArrowRight))
+        self.next_button.setIcon(icons['next'])
         self.next_button.setText(self.translator.translate("button_forward"))
         self.next_button.setToolTip(self.translator.translate("tooltip_next"))
         self.next_button.clicked.connect(self.next_image)
@@ -150,7 +191,7 @@ class MainWindow(QMainWindow):
         
         # Archive button
         self.archive_button = QPushButton()
-        self.archive_button.setIcon(self.style().standardIcon(self.style().StandardPixmap.SP_DialogSaveButton))
+        self.archive_button.setIcon(icons['save'])
         self.archive_button.setText(self.translator.translate("button_archive"))
         self.archive_button.setToolTip(self.translator.translate("tooltip_archive"))
         self.archive_button.clicked.connect(self.archive_current_image)
@@ -159,7 +200,7 @@ class MainWindow(QMainWindow):
         
         # Delete button
         self.delete_button = QPushButton()
-        self.delete_button.setIcon(self.style().standardIcon(self.style().StandardPixmap.SP_TrashIcon))
+        self.delete_button.setIcon(icons['trash'])
         self.delete_button.setText(self.translator.translate("button_delete"))
         self.delete_button.setToolTip(self.translator.translate("tooltip_delete"))
         self.delete_button.clicked.connect(self.delete_current_image)
@@ -196,62 +237,73 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.button_container)
         layout.addWidget(self.info_label)
         layout.addLayout(button_layout)
+        
+        # Keyboard shortcuts, dispatched by Qt's shortcut system (M belongs to mark_action)
+        QShortcut(QKeySequence(Qt.Key.Key_Right), self, activated=self.next_image)
+        QShortcut(QKeySequence(Qt.Key.Key_Down), self, activated=self.next_image)
+        QShortcut(QKeySequence(Qt.Key.Key_Left), self, activated=self.previous_image)
+        # Holding the key must not archive one image after another
+        archive_shortcut = QShortcut(QKeySequence(Qt.Key.Key_Up), self, activated=self.archive_current_image)
+        archive_shortcut.setAutoRepeat(False)
+        for rating, key in enumerate((Qt.Key.Key_0, Qt.Key.Key_1, Qt.Key.Key_2,
+                                      Qt.Key.Key_3, Qt.Key.Key_4, Qt.Key.Key_5)):
+            QShortcut(QKeySequence(key), self, activated=partial(self.rate_current_image, rating))
     
     def create_menu_bar(self):
         """Create the application menu bar"""
         menubar = self.menuBar()
         
         # File menu
-        file_menu = menubar.addMenu(self.translator.translate("menu_file"))
+        self.file_menu = menubar.addMenu(self.translator.translate("menu_file"))
         
-        open_action = QAction(self.translator.translate("menu_open"), self)
-        open_action.setShortcut("Ctrl+O")
-        open_action.triggered.connect(self.open_folder)
-        file_menu.addAction(open_action)
+        self.open_action = QAction(self.translator.translate("menu_open"), self)
+        self.open_action.setShortcut("Ctrl+O")
+        self.open_action.triggered.connect(self.open_folder)
+        self.file_menu.addAction(self.open_action)
         
-        file_menu.addSeparator()
+        self.file_menu.addSeparator()
         
-        exit_action = QAction(self.translator.translate("menu_exit"), self)
-        exit_action.setShortcut("Ctrl+Q")
-        exit_action.triggered.connect(self.close)
-        file_menu.addAction(exit_action)
+        self.exit_action = QAction(self.translator.translate("menu_exit"), self)
+        self.exit_action.setShortcut("Ctrl+Q")
+        self.exit_action.triggered.connect(self.close)
+        self.file_menu.addAction(self.exit_action)
         
         # Mark menu
-        mark_menu = menubar.addMenu(self.translator.translate("menu_mark"))
+        self.mark_menu = menubar.addMenu(self.translator.translate("menu_mark"))
         
-        mark_action = QAction(self.translator.translate("button_mark"), self)
-        mark_action.setShortcut("M")
-        mark_action.triggered.connect(self.toggle_mark_image)
-        mark_menu.addAction(mark_action)
+        self.mark_action = QAction(self.translator.translate("button_mark"), self)
+        self.mark_action.setShortcut("M")
+        self.mark_action.triggered.connect(self.toggle_mark_image)
+        self.mark_menu.addAction(self.mark_action)
         
-        compare_action = QAction(self.translator.translate("button_compare"), self)
-        compare_action.triggered.connect(self.show_compare_dialog)
-        mark_menu.addAction(compare_action)
+        self.compare_action = QAction(self.translator.translate("button_compare"), self)
+        self.compare_action.triggered.connect(self.show_compare_dialog)
+        self.mark_menu.addAction(self.compare_action)
         
-        mark_menu.addSeparator()
+        self.mark_menu.addSeparator()
         
-        archive_marked_action = QAction(self.translator.translate("button_archive_marked"), self)
-        archive_marked_action.triggered.connect(self.archive_marked_images)
-        mark_menu.addAction(archive_marked_action)
+        self.archive_marked_action = QAction(self.translator.translate("button_archive_marked"), self)
+        self.archive_marked_action.triggered.connect(self.archive_marked_images)
+        self.mark_menu.addAction(self.archive_marked_action)
         
-        delete_marked_action = QAction(self.translator.translate("button_delete_marked"), self)
-        delete_marked_action.triggered.connect(self.delete_marked_images)
-        mark_menu.addAction(delete_marked_action)
+        self.delete_marked_action = QAction(self.translator.translate("button_delete_marked"), self)
+        self.delete_marked_action.triggered.connect(self.delete_marked_images)
+        self.mark_menu.addAction(self.delete_marked_action)
         
         # Edit menu
-        edit_menu = menubar.addMenu(self.translator.translate("menu_edit"))
+        self.edit_menu = menubar.addMenu(self.translator.translate("menu_edit"))
         
-        settings_action = QAction(self.translator.translate("menu_settings"), self)
-        settings_action.setShortcut("Ctrl+E")
-        settings_action.triggered.connect(self.show_settings)
-        edit_menu.addAction(settings_action)
+        self.settings_action = QAction(self.translator.translate("menu_settings"), self)
+        self.settings_action.setShortcut("Ctrl+E")
+        self.settings_action.triggered.connect(self.show_settings)
+        self.edit_menu.addAction(self.settings_action)
         
         # Help menu
-        help_menu = menubar.addMenu(self.translator.translate("menu_help"))
+        self.help_menu = menubar.addMenu(self.translator.translate("menu_help"))
         
-        about_action = QAction(self.translator.translate("menu_about"), self)
-        about_action.triggered.connect(self.show_about)
-        help_menu.addAction(about_action)
+        self.about_action = QAction(self.translator.translate("menu_about"), self)
+        self.about_action.triggered.connect(self.show_about)
+        self.help_menu.addAction(self.about_action)
     
     def open_folder(self):
         """Open folder selection dialog"""
@@ -267,6 +319,7 @@ class MainWindow(QMainWindow):
     
     def load_folder(self, folder_path):
         """Load images from specified folder"""
+        self.flush_ratings()
         self.image_handler.load_images_from_folder(folder_path)
         
         if self.image_handler.has_images():
@@ -280,41 +333,92 @@ class MainWindow(QMainWindow):
             self.info_label.setText(self.translator.translate("info_no_images"))
             self.update_button_states()
     
-    def display_current_image(self):
-        """Display the current image"""
+    def display_current_image(self, preview=True):
+        """Display the current image
+        
+        With preview, an image that is not cached yet is decoded in the background
+        while a stand-in is shown.
+        """
         image_path = self.image_handler.get_current_image_path()
         
         if not image_path:
             return
         
+        # Coalesce pixmap, title and info bar changes into a single repaint
+        self.setUpdatesEnabled(False)
         try:
-            self.image_handler.open_image(image_path)
+            # Show a cached thumbnail (or nothing) right away if the full image needs decoding
+            if (not preview or self.image_handler.is_image_cached(image_path)
+                    or not self.image_handler.open_preview(image_path, self.get_display_size())):
+                self.image_handler.open_image(image_path, self.get_display_size())
             self.scale_and_display_image()
-            self.setWindowTitle(f"{self.translator.translate('app_title')} - {image_path.name}")
-            
-            # Get and display rating
-            rating = self.exif_handler.get_image_rating(image_path)
-            rating_stars = self.exif_handler.format_rating_display(rating)
-            rating_text = f" {rating_stars}" if rating_stars else ""
             
-            self.info_label.setText(self.translator.translate("info_images_format",
-                current=self.image_handler.get_current_index() + 1,
-                total=self.image_handler.get_image_count(),
-                filename=image_path.name,
-                rating=rating_text
-            ))
+            # Show the last known rating right away and read the file off the GUI thread
+            rating = self.pending_ratings.get(image_path)
+            if rating is None:
+                rating = self.exif_handler.get_cached_rating(image_path) or 0
+                self.exif_handler.read_rating_in_background(image_path)
+            self.current_rating = rating
+            self.update_info_label()
         except Exception as e:
             self.image_label.setText(self.translator.translate("error_loading",
                 filename=image_path.name, error=str(e)))
+        finally:
+            # Re-enabling updates schedules one repaint of the whole window
+            self.setUpdatesEnabled(True)
+    
+    def update_info_label(self):
+        """Update window title and info bar for the current image"""
+        image_path = self.image_handler.get_current_image_path()
+        if not image_path:
+            return
+        
+        self.setWindowTitle(f"{self.translator.translate('app_title')} - {image_path.name}")
+        
+        rating_stars = self.exif_handler.format_rating_display(self.current_rating)
+        rating_text = f" {rating_stars}" if rating_stars else ""
+        
+        self.info_label.setText(self.translator.translate("info_images_format",
+            current=self.image_handler.get_current_index() + 1,
+            total=self.image_handler.get_image_count(),
+            filename=image_path.name,
+            rating=rating_text
+        ))
+    
+    def on_image_cached(self, image_path):
+        """Replace the preview once the full image is decoded"""
+        if self.image_handler.showing_preview and image_path == self.image_handler.get_current_image_path():
+            self.display_current_image()
+    
+    def on_rating_read(self, image_path, rating):
+        """Show a rating read in the background if its image is still displayed"""
+        if (image_path == self.image_handler.get_current_image_path()
+                and image_path not in self.pending_ratings and rating != self.current_rating):
+            self.current_rating = rating
+            self.update_info_label()
+    
+    def on_image_failed(self, image_path):
+        """Decode in the foreground to report the error of a failed background decode"""
+        if self.image_handler.showing_preview and image_path == self.image_handler.get_current_image_path():
+            self.display_current_image(preview=False)
     
     def scale_and_display_image(self):
         """Scale and display the current image"""
-        scaled_pixmap = self.image_handler.scale_pixmap_for_display(self.image_label.size())
+        scaled_pixmap = self.image_handler.scale_pixmap_for_display(
+            self.image_label.size(), self.image_label.devicePixelRatioF())
         if scaled_pixmap:
             # Check if current image is marked
             if self.image_handler.is_current_image_marked():
                 scaled_pixmap = self.add_bookmark_indicator(scaled_pixmap)
             self.image_label.setPixmap(scaled_pixmap)
+        elif self.image_handler.showing_preview:
+            # Nothing to show until the background decode is done, the previous
+            # image must not stay up under the name of the current one
+            self.image_label.clear()
+    
+    def get_display_size(self):
+        """Return the image label size in device pixels, the size images are decoded for"""
+        return self.image_label.size() * self.image_label.devicePixelRatioF()
     
     def add_bookmark_indicator(self, pixmap):
         """Add a bookmark symbol to the top-right corner of the pixmap"""
@@ -323,7 +427,8 @@ class MainWindow(QMainWindow):
         
         # Bookmark dimensions
         bookmark_size = 25
-        bookmark_x = pixmap.width() - bookmark_size - 5
+        # Painter coordinates are in device independent pixels
+        bookmark_x = round(pixmap.width() / pixmap.devicePixelRatio()) - bookmark_size - 5
         bookmark_y = 5
         
         # Draw bookmark background (green color)
@@ -350,12 +455,14 @@ class MainWindow(QMainWindow):
     
     def next_image(self):
         """Display next image"""
+        self.flush_ratings()
         if self.image_handler.next_image():
             self.display_current_image()
             self.update_button_states()
     
     def previous_image(self):
         """Display previous image"""
+        self.flush_ratings()
         if self.image_handler.previous_image():
             self.display_current_image()
             self.update_button_states()
@@ -366,52 +473,52 @@ class MainWindow(QMainWindow):
         if not image_path:
             return
         
-        if self.exif_handler.set_image_rating(image_path, rating, self):
-            rating_stars = self.exif_handler.format_rating_display(rating)
-            rating_text = f" {rating_stars}" if rating_stars else ""
-            
-            self.info_label.setText(self.translator.translate("info_images_format",
-                current=self.image_handler.get_current_index() + 1,
-                total=self.image_handler.get_image_count(),
-                filename=image_path.name,
-                rating=rating_text
-            ))
+        # Show the rating now, write it to the file once typing settles
+        self.pending_ratings[image_path] = rating
+        self.rating_timer.start()
+        
+        self.current_rating = rating
+        self.update_info_label()
+    
+    def flush_ratings(self):
+        """Write pending ratings to the image files"""
+        self.rating_timer.stop()
+        pending, self.pending_ratings = self.pending_ratings, {}
+        for image_path, rating in pending.items():
+            self.exif_handler.set_image_rating(image_path, rating, self)
     
     def archive_current_image(self):
         """Archive current image"""
+        self.flush_ratings()
         image_path = self.image_handler.get_current_image_path()
         if not image_path:
             return
         
         if self.file_manager.archive_image(image_path, self.archive_folder_name, self, self.archive_related_files):
             self.image_handler.remove_current_image()
-            
-            if self.image_handler.has_images():
-                self.display_current_image()
-            else:
-                self.button_container.setVisible(True)
-                self.image_label.setVisible(False)
-                self.info_label.setText(self.translator.translate("info_no_more_images"))
-            
-            self.update_button_states()
+            self.refresh_after_removal()
     
     def delete_current_image(self):
         """Delete current image"""
+        self.flush_ratings()
         image_path = self.image_handler.get_current_image_path()
         if not image_path:
             return
         
         if self.file_manager.delete_image(image_path, self, self.translator, self.delete_related_files):
             self.image_handler.remove_current_image()
-            
-            if self.image_handler.has_images():
-                self.display_current_image()
-            else:
-                self.button_container.setVisible(True)
-                self.image_label.setVisible(False)
-                self.info_label.setText(self.translator.translate("info_no_more_images"))
-            
-            self.update_button_states()
+            self.refresh_after_removal()
+    
+    def refresh_after_removal(self):
+        """Show the next remaining image or the folder prompt after images were removed"""
+        if self.image_handler.has_images():
+            self.display_current_image()
+        else:
+            self.button_container.setVisible(True)
+            self.image_label.setVisible(False)
+            self.info_label.setText(self.translator.translate("info_no_more_images"))
+        
+        self.update_button_states()
     
     def toggle_mark_image(self):
         """Toggle mark status for current image"""
@@ -436,11 +543,16 @@ class MainWindow(QMainWindow):
             )
             return
         
-        # Create and show comparison dialog
-        compare_dialog = CompareDialog(self, marked_images, self.translator)
-        # Connect signal for unmarking images
-        compare_dialog.image_unmarked.connect(self.on_image_unmarked)
-        compare_dialog.exec()
+        # Create the comparison dialog once (dialogs are imported on first use),
+        # later openings only load thumbnails of newly marked images
+        if self._compare_dialog is None:
+            from ui.dialogs import CompareDialog
+            self._compare_dialog = CompareDialog(self, marked_images, self.translator, self.image_handler)
+            # Connect signal for unmarking images
+            self._compare_dialog.image_unmarked.connect(self.on_image_unmarked)
+        else:
+            self._compare_dialog.set_images(marked_images)
+        self._compare_dialog.exec()
     
     def on_image_unmarked(self, image_path):
         """Handle image unmarked from compare dialog"""
@@ -449,6 +561,7 @@ class MainWindow(QMainWindow):
     
     def archive_marked_images(self):
         """Archive all marked images"""
+        self.flush_ratings()
         marked_images = self.image_handler.get_marked_images()
         
         if not marked_images:
@@ -470,29 +583,22 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.StandardButton.No:
             return
         
-        archived_count = 0
-        for image_path in marked_images:
-            try:
-                if self.file_manager.archive_image(image_path, self.archive_folder_name, self, self.archive_related_files):
-                    archived_count += 1
-                    # Remove from displayed list if it's the current image
-                    if self.image_handler.get_current_image_path() == image_path:
-                        self.image_handler.remove_current_image()
-            except Exception as e:
-                print(f"Error archiving {image_path}: {e}")
-        
-        # Clear marked images
-        self.image_handler.clear_marked_images()
-        
-        # Refresh display
-        if self.image_handler.has_images():
-            self.display_current_image()
-        else:
-            self.button_container.setVisible(True)
-            self.image_label.setVisible(False)
-            self.info_label.setText(self.translator.translate("info_no_more_images"))
+        # Move all marked images in one batch instead of one dialog per file
+        archived, failed = self.file_manager.archive_batch(
+            marked_images, self.archive_folder_name, self.archive_related_files)
+        archived_count = len(archived)
+        # Removing unmarks the archived images, images that failed stay marked
+        self.image_handler.remove_images(archived)
         
-        self.update_button_states()
+        self.refresh_after_removal()
+        
+        if failed:
+            QMessageBox.critical(
+                self,
+                self.translator.translate("archive_error"),
+                self.translator.translate("archive_error_message",
+                    error="\n" + self.file_manager.format_failures(failed))
+            )
         
         # Show success message
         QMessageBox.information(
@@ -503,6 +609,7 @@ class MainWindow(QMainWindow):
     
     def delete_marked_images(self):
         """Delete all marked images"""
+        self.flush_ratings()
         marked_images = self.image_handler.get_marked_images()
         
         if not marked_images:
@@ -524,29 +631,21 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.StandardButton.No:
             return
         
-        deleted_count = 0
-        for image_path in marked_images:
-            try:
-                if self.file_manager.delete_image(image_path, self, self.translator, self.delete_related_files):
-                    deleted_count += 1
-                    # Remove from displayed list if it's the current image
-                    if self.image_handler.get_current_image_path() == image_path:
-                        self.image_handler.remove_current_image()
-            except Exception as e:
-                print(f"Error deleting {image_path}: {e}")
-        
-        # Clear marked images
-        self.image_handler.clear_marked_images()
-        
-        # Refresh display
-        if self.image_handler.has_images():
-            self.display_current_image()
-        else:
-            self.button_container.setVisible(True)
-            self.image_label.setVisible(False)
-            self.info_label.setText(self.translator.translate("info_no_more_images"))
+        # Delete all marked images in one batch instead of two dialogs per file
+        deleted, failed = self.file_manager.delete_batch(marked_images, self.delete_related_files)
+        deleted_count = len(deleted)
+        # Removing unmarks the deleted images, images that failed stay marked
+        self.image_handler.remove_images(deleted)
         
-        self.update_button_states()
+        self.refresh_after_removal()
+        
+        if failed:
+            QMessageBox.critical(
+                self,
+                self.translator.translate("delete_error"),
+                self.translator.translate("delete_error_message",
+                    error="\n" + self.file_manager.format_failures(failed))
+            )
         
         # Show success message
         QMessageBox.information(
@@ -557,19 +656,19 @@ class MainWindow(QMainWindow):
     
     def update_button_states(self):
         """Update button enabled states based on image availability"""
-        has_images = self.image_handler.has_images()
-        has_marked = self.image_handler.get_marked_image_count() > 0
+        has_images, can_go_previous, can_go_next, marked_count, current_marked = \
+            self.image_handler.state_snapshot()
         
-        self.prev_button.setEnabled(self.image_handler.can_go_previous())
-        self.next_button.setEnabled(self.image_handler.can_go_next())
+        self.prev_button.setEnabled(can_go_previous)
+        self.next_button.setEnabled(can_go_next)
         self.archive_button.setEnabled(has_images)
         self.delete_button.setEnabled(has_images)
         self.mark_button.setEnabled(has_images)
-        self.compare_button.setEnabled(has_marked)
+        self.compare_button.setEnabled(marked_count > 0)
         
         # Update mark button text based on current image state
         if has_images:
-            if self.image_handler.is_current_image_marked():
+            if current_marked:
                 self.mark_button.setText(self.translator.translate("button_unmark"))
             else:
                 self.mark_button.setText(self.translator.translate("button_mark"))
@@ -577,35 +676,16 @@ class MainWindow(QMainWindow):
     def resizeEvent(self, event):
         """Handle window resize"""
         super().resizeEvent(event)
-        self.scale_and_display_image()
+        self.resize_timer.start()
     
-    def keyPressEvent(self, event):
-        """Handle keyboard shortcuts"""
-        if event.key() == Qt.Key.Key_Right or event.key() == Qt.Key.Key_Down:
-            self.next_image()
-        elif event.key() == Qt.Key.Key_Left:
-            self.previous_image()
-        elif event.key() == Qt.Key.Key_Up:
-            self.archive_current_image()
-        elif event.key() == Qt.Key.Key_M:
-            self.toggle_mark_image()
-        elif event.key() == Qt.Key.Key_0:
-            self.rate_current_image(0)
-        elif event.key() == Qt.Key.Key_1:
-            self.rate_current_image(1)
-        elif event.key() == Qt.Key.Key_2:
-            self.rate_current_image(2)
-        elif event.key() == Qt.Key.Key_3:
-            self.rate_current_image(3)
-        elif event.key() == Qt.Key.Key_4:
-            self.rate_current_image(4)
-        elif event.key() == Qt.Key.Key_5:
-            self.rate_current_image(5)
-        else:
-            super().keyPressEvent(event)
+    def closeEvent(self, event):
+        """Write pending ratings before closing"""
+        self.flush_ratings()
+        super().closeEvent(event)
     
     def show_settings(self):
         """Show settings dialog"""
+        from ui.dialogs import SettingsDialog
         dialog = SettingsDialog(
             self,
             self.archive_folder_name,
@@ -642,45 +722,38 @@ class MainWindow(QMainWindow):
     def refresh_ui(self):
         """Refresh all UI texts with current language"""
         self.setWindowTitle(self.translator.translate("app_title"))
-        self.welcome_label.setText(self.translator.translate("welcome_message"))
-        self.open_folder_button.setText(self.translator.translate("open_folder_button"))
+        translate = self.translator.translate
+        for attribute, setter, key in self._TRANSLATED_TEXTS:
+            getattr(getattr(self, attribute), setter)(translate(key))
         
-        self.prev_button.setText(self.translator.translate("button_back"))
-        self.prev_button.setToolTip(self.translator.translate("tooltip_previous"))
-        
-        self.next_button.setText(self.translator.translate("button_forward"))
-        self.next_button.setToolTip(self.translator.translate("tooltip_next"))
-        
-        self.archive_button.setText(self.translator.translate("button_archive"))
-        self.archive_button.setToolTip(self.translator.translate("tooltip_archive"))
-        
-        self.delete_button.setText(self.translator.translate("button_delete"))
-        self.delete_button.setToolTip(self.translator.translate("tooltip_delete"))
+        # Build the comparison dialog in the new language when it is opened next
+        if self._compare_dialog is not None:
+            self._compare_dialog.deleteLater()
+            self._compare_dialog = None
         
-        self.mark_button.setText(self.translator.translate("button_mark"))
-        self.mark_button.setToolTip(self.translator.translate("tooltip_mark"))
-        
-        self.compare_button.setText(self.translator.translate("button_compare"))
-        self.compare_button.setToolTip(self.translator.translate("tooltip_compare"))
-        
-        # Recreate menu bar
-        self.menuBar().clear()
-        self.create_menu_bar()
-        
-        # Update current image display
+        # Update texts of the current image without decoding it again
         if self.image_handler.has_images():
-            self.display_current_image()
+            self.update_info_label()
     
     def show_about(self):
         """Show about dialog"""
-        about_text = self.translator.translate("about_message").replace("Version 1.0", f"Version {__version__}")
+        about_text = self.translator.translate("about_message", version=__version__)
         QMessageBox.about(self, self.translator.translate("about_title"), about_text)
 
 
 def main():
     """Application entry point"""
     app = QApplication(sys.argv)
+    # Names the per-user cache folder (QStandardPaths.CacheLocation) of the thumbnail cache
+    app.setApplicationName("GuckMohl")
     window = MainWindow()
+    
+    # Optional folder argument, e.g. "python main.py <folder>"
+    if len(sys.argv) > 1 and Path(sys.argv[1]).is_dir():
+        folder_path = sys.argv[1]
+        # Never paint the welcome screen, load once the window is laid out
+        window.button_container.setVisible(False)
+        QTimer.singleShot(0, lambda: window.load_folder(folder_path))
     window.show()
     sys.exit(app.exec())
 
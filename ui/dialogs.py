@@ -1,11 +1,13 @@
 """UI dialogs for GuckMohl"""
+import os
 from pathlib import Path
-from PIL import Image, ImageQt
 from PySide6.QtWidgets import (QDialog, QFormLayout, QLabel, QPushButton, QHBoxLayout, 
                                QComboBox, QDialogButtonBox, QInputDialog, QMessageBox, QCheckBox, QVBoxLayout,
                                QGridLayout, QScrollArea, QWidget, QScrollBar)
-from PySide6.QtCore import Qt, QTimer, Signal
-from PySide6.QtGui import QFont, QPixmap, QCursor
+from PySide6.QtCore import Qt, QObject, QRect, QRunnable, QSize, QThreadPool, QTimer, Signal
+from PySide6.QtGui import QFont, QImage, QPixmap, QPixmapCache, QCursor
+
+from core.thumbnail_cache import ThumbnailCache
 
 
 class ClickableImageLabel(QLabel):
@@ -23,9 +25,39 @@ class ClickableImageLabel(QLabel):
         self.image_clicked.emit(self.image_path)
 
 
+class ThumbnailSignals(QObject):
+    """Signals to hand thumbnails loaded in the background back to the GUI thread"""
+    thumbnail_loaded = Signal(object, QImage)
+    thumbnail_failed = Signal(object)
+
+
+class ThumbnailWorker(QRunnable):
+    """Loads the source image of a compare thumbnail in a worker thread"""
+    
+    def __init__(self, image_path, load, signals, thumbnail_cache=None):
+        super().__init__()
+        self.image_path = image_path
+        self.load = load
+        self.signals = signals
+        self.thumbnail_cache = thumbnail_cache
+    
+    def run(self):
+        try:
+            qimage = self.load(self.image_path)
+        except Exception:
+            self.signals.thumbnail_failed.emit(self.image_path)
+            return
+        self.signals.thumbnail_loaded.emit(self.image_path, qimage)
+        # Encode the disk thumbnail only once the thumbnail is on its way to the grid
+        if self.thumbnail_cache:
+            self.thumbnail_cache.store(self.image_path, qimage)
+
+
 class SettingsDialog(QDialog):
     """Settings dialog for configuring archive folder and language"""
     
+    INVALID_FOLDER_CHARS = frozenset('<>:"/\\|?*')  # Not allowed in folder names on Windows
+    
     def __init__(self, parent, current_archive_folder, current_language, available_languages, translator, archive_related_files=False, delete_related_files=False):
         super().__init__(parent)
         self.translator = translator
@@ -39,14 +71,13 @@ class SettingsDialog(QDialog):
         layout = QFormLayout()
         
         # Archive folder input field
-        self.archive_input = QInputDialog()
         self.archive_folder = current_archive_folder
-        archive_label = QLabel(current_archive_folder)
+        self.archive_label = QLabel(current_archive_folder)
         change_archive_btn = QPushButton("...")
-        change_archive_btn.clicked.connect(lambda: self.change_archive_folder(archive_label))
+        change_archive_btn.clicked.connect(self.change_archive_folder)
         
         archive_layout = QHBoxLayout()
-        archive_layout.addWidget(archive_label)
+        archive_layout.addWidget(self.archive_label)
         archive_layout.addWidget(change_archive_btn)
         
         # Archive related files checkbox
@@ -92,9 +123,8 @@ class SettingsDialog(QDialog):
         main_layout.addWidget(buttons)
         
         self.setLayout(main_layout)
-        self.archive_label = archive_label
     
-    def change_archive_folder(self, label):
+    def change_archive_folder(self):
         text, ok = QInputDialog.getText(
             self,
             self.translator.translate("settings_title"),
@@ -102,10 +132,10 @@ class SettingsDialog(QDialog):
             text=self.archive_folder
         )
         
-        if ok and text.strip():
+        text = text.strip()
+        if ok and text:
             # Validate folder name (check for invalid characters)
-            invalid_chars = ['<', '>', ':', '"', '/', '\\', '|', '?', '*']
-            if any(char in text for char in invalid_chars):
+            if not self.INVALID_FOLDER_CHARS.isdisjoint(text):
                 QMessageBox.warning(
                     self,
                     self.translator.translate("settings_invalid_name"),
@@ -113,8 +143,8 @@ class SettingsDialog(QDialog):
                 )
                 return
             
-            self.archive_folder = text.strip()
-            label.setText(self.archive_folder)
+            self.archive_folder = text
+            self.archive_label.setText(self.archive_folder)
     
     def get_settings(self):
         return {
@@ -130,12 +160,20 @@ class CompareDialog(QDialog):
     # Signal emitted when an image is unmarked
     image_unmarked = Signal(Path)
     
-    def __init__(self, parent, marked_image_paths, translator):
+    def __init__(self, parent, marked_image_paths, translator, image_handler):
         super().__init__(parent)
         self.translator = translator
+        # Decoding and the thumbnail cache are shared with the main view, see load_thumbnail_image
+        self.image_handler = image_handler
+        self.thumbnail_cache = image_handler.thumbnail_cache
         self.marked_image_paths = list(marked_image_paths)  # Make a mutable copy
-        self.image_labels = {}  # Store image labels for dynamic resizing
+        self.image_labels = {}  # Image path -> image label of loaded thumbnails, for dynamic resizing
         self.image_containers = {}  # Store containers by path for removal
+        self.thumbnail_width = 200  # Current thumbnail size, see update_thumbnails_size
+        self._queued_thumbnails = set()  # Image paths whose thumbnail is loading or loaded
+        self._thumbnail_signals = ThumbnailSignals()
+        self._thumbnail_signals.thumbnail_loaded.connect(self.on_thumbnail_loaded)
+        self._thumbnail_signals.thumbnail_failed.connect(self.on_thumbnail_failed)
         self.setWindowTitle(self.translator.translate("compare_title"))
         self.setMinimumSize(900, 700)
         
@@ -168,6 +206,8 @@ class CompareDialog(QDialog):
         
         # Grid widget and layout
         self.grid_widget = QWidget()
+        # One shared style for all thumbnail labels, their grey background is the loading placeholder
+        self.grid_widget.setStyleSheet("ClickableImageLabel { background-color: #f0f0f0; border: 1px solid #ccc; }")
         self.grid_layout = QGridLayout(self.grid_widget)
         self.grid_layout.setSpacing(10)
         
@@ -180,7 +220,7 @@ class CompareDialog(QDialog):
             # Create container for each image
             image_container = self.create_image_thumbnail(image_path)
             self.grid_layout.addWidget(image_container, row, col)
-            self.image_containers[str(image_path)] = (image_container, row, col)
+            self.image_containers[image_path] = (image_container, row, col)
             
             col += 1
             if col >= self.columns:
@@ -188,7 +228,8 @@ class CompareDialog(QDialog):
                 row += 1
         
         # Add stretch to fill remaining rows
-        self.grid_layout.setRowStretch(row + 1, 1)
+        self.stretch_row = row + 1
+        self.grid_layout.setRowStretch(self.stretch_row, 1)
         self.scroll_area.setWidget(self.grid_widget)
         layout.addWidget(self.scroll_area)
         
@@ -203,6 +244,13 @@ class CompareDialog(QDialog):
         self.resize_timer = QTimer()
         self.resize_timer.setSingleShot(True)
         self.resize_timer.timeout.connect(self.update_thumbnails_size)
+        
+        # Thumbnails are loaded once they come near the viewport, checked when scrolling settles
+        self.visible_timer = QTimer()
+        self.visible_timer.setSingleShot(True)
+        self.visible_timer.setInterval(50)
+        self.visible_timer.timeout.connect(self.load_visible_thumbnails)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(lambda: self.visible_timer.start())
     
     def update_count_label(self):
         """Update the count label text"""
@@ -216,33 +264,24 @@ class CompareDialog(QDialog):
         combined_text = f"{count_text}\n{info_text}"
         self.info_label.setText(combined_text)
     
-    def correct_image_orientation(self, image):
-        """Correct image orientation based on EXIF tag 274 (Orientation)"""
-        try:
-            exif = image.getexif()
-            orientation = exif.get(274, 1)  # Tag 274 = Orientation, default = 1 (normal)
-            
-            # Handle all 8 EXIF orientation values
-            if orientation == 2:  # Horizontal flip
-                image = image.transpose(Image.FLIP_LEFT_RIGHT)
-            elif orientation == 3:  # 180 degree rotation
-                image = image.rotate(180, expand=True)
-            elif orientation == 4:  # Vertical flip
-                image = image.transpose(Image.FLIP_TOP_BOTTOM)
-            elif orientation == 5:  # Horizontal flip + 90 CW rotation
-                image = image.transpose(Image.FLIP_LEFT_RIGHT)
-                image = image.rotate(90, expand=True)
-            elif orientation == 6:  # 90 CW rotation
-                image = image.rotate(270, expand=True)
-            elif orientation == 7:  # Horizontal flip + 270 CW rotation
-                image = image.transpose(Image.FLIP_LEFT_RIGHT)
-                image = image.rotate(270, expand=True)
-            elif orientation == 8:  # 270 CW rotation
-                image = image.rotate(90, expand=True)
-        except (AttributeError, KeyError, IndexError):
-            pass
-        
-        return image
+    def load_thumbnail_image(self, image_path):
+        """Return an upright image reduced to thumbnail cache size (called from worker threads)"""
+        # Cached thumbnails are stored upright and need no decode of the original
+        if self.thumbnail_cache:
+            qimage = self.thumbnail_cache.load(image_path)
+            if qimage is not None:
+                return qimage
+        
+        # QImageReader scales JPEGs while decoding and applies the EXIF orientation,
+        # decode_image only falls back to PIL for files Qt cannot read
+        size = ThumbnailCache.THUMBNAIL_SIZE
+        qimage, _ = self.image_handler.decode_image(image_path, QSize(size, size))
+        
+        # Reduce once, every thumbnail size is scaled from this copy
+        if qimage.width() > size or qimage.height() > size:
+            qimage = qimage.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio,
+                                   Qt.TransformationMode.SmoothTransformation)
+        return qimage
     
     def create_image_thumbnail(self, image_path):
         """Create a thumbnail widget for an image"""
@@ -251,53 +290,72 @@ class CompareDialog(QDialog):
         container_layout = QVBoxLayout(container)
         container_layout.setContentsMargins(5, 5, 5, 5)
         
-        try:
-            # Load and correct orientation
-            pil_image = Image.open(str(image_path))
-            pil_image = self.correct_image_orientation(pil_image)
-            
-            # Store original image for later rescaling
-            container.original_pil_image = pil_image
-            container.image_path = image_path
-            
-            # Create clickable image label
-            image_label = ClickableImageLabel(image_path)
-            image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            image_label.setMinimumHeight(200)
-            image_label.setStyleSheet("background-color: #f0f0f0; border: 1px solid #ccc;")
-            
-            # Connect click signal
-            image_label.image_clicked.connect(self.on_image_clicked)
-            
-            # Initial pixmap scaling (max 200x200)
-            self.scale_and_set_pixmap(image_label, pil_image, 200)
-            
-            # Store for dynamic resizing
-            self.image_labels[id(container)] = (image_label, pil_image)
-            container.image_label = image_label
-            
-            # Create filename label
-            filename_label = QLabel(image_path.name)
-            filename_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            filename_font = QFont()
-            filename_font.setPointSize(filename_font.pointSize() - 1)
-            filename_label.setFont(filename_font)
-            filename_label.setWordWrap(True)
-            
-            container_layout.addWidget(image_label, 1)
-            container_layout.addWidget(filename_label, 0)
-            
-        except Exception as e:
-            # Show error label if image cannot be loaded
-            error_label = QLabel(f"Error loading:\n{image_path.name}")
-            error_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            error_font = QFont()
-            error_font.setPointSize(error_font.pointSize() - 1)
-            error_label.setFont(error_font)
-            container_layout.addWidget(error_label)
+        container.image_path = image_path
+        
+        # Create clickable image label, the pixmap follows in on_thumbnail_loaded
+        image_label = ClickableImageLabel(image_path)
+        image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        image_label.setMinimumHeight(200)
+        
+        # Connect click signal
+        image_label.image_clicked.connect(self.on_image_clicked)
+        container.image_label = image_label
+        
+        # Create filename label
+        filename_label = QLabel(image_path.name)
+        filename_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        filename_font = QFont()
+        filename_font.setPointSize(filename_font.pointSize() - 1)
+        filename_label.setFont(filename_font)
+        filename_label.setWordWrap(True)
+        
+        container_layout.addWidget(image_label, 1)
+        container_layout.addWidget(filename_label, 0)
         
         return container
     
+    def load_visible_thumbnails(self):
+        """Start loading the thumbnails within half a viewport of the visible grid area"""
+        viewport = self.scroll_area.viewport()
+        margin = viewport.height() // 2
+        visible = QRect(0, self.scroll_area.verticalScrollBar().value() - margin,
+                        viewport.width(), viewport.height() + 2 * margin)
+        
+        # Decode in the thread pool so the dialog stays responsive
+        for image_path, (container, _, _) in self.image_containers.items():
+            if image_path in self._queued_thumbnails or not container.geometry().intersects(visible):
+                continue
+            self._queued_thumbnails.add(image_path)
+            
+            # Images shown before may still be in the pixmap cache
+            source = QPixmapCache.find(self.thumbnail_key(image_path))
+            if source is not None:
+                self.scale_and_set_pixmap(container.image_label, source, self.thumbnail_width)
+                self.image_labels[image_path] = container.image_label
+                continue
+            worker = ThumbnailWorker(image_path, self.load_thumbnail_image,
+                                     self._thumbnail_signals, self.thumbnail_cache)
+            QThreadPool.globalInstance().start(worker)
+    
+    def on_thumbnail_loaded(self, image_path, qimage):
+        """Show a thumbnail loaded in the background if its image is still in the grid"""
+        entry = self.image_containers.get(image_path)
+        if entry is None:
+            return
+        container = entry[0]
+        
+        # Keep the source for dynamic resizing in the size-limited pixmap cache
+        source = QPixmap.fromImage(qimage)
+        QPixmapCache.insert(self.thumbnail_key(image_path), source)
+        self.scale_and_set_pixmap(container.image_label, source, self.thumbnail_width)
+        self.image_labels[image_path] = container.image_label
+    
+    def on_thumbnail_failed(self, image_path):
+        """Show error text if an image cannot be loaded"""
+        entry = self.image_containers.get(image_path)
+        if entry is not None:
+            entry[0].image_label.setText(f"Error loading:\n{image_path.name}")
+    
     def on_image_clicked(self, image_path):
         """Handle image click - remove from marked images"""
         image_path = Path(image_path)
@@ -307,62 +365,89 @@ class CompareDialog(QDialog):
             self.marked_image_paths.remove(image_path)
         
         # Remove from containers
-        path_str = str(image_path)
-        if path_str in self.image_containers:
-            container, row, col = self.image_containers[path_str]
+        if image_path in self.image_containers:
+            container, row, col = self.image_containers[image_path]
             
             # Remove widget from layout
             self.grid_layout.removeWidget(container)
             container.deleteLater()
             
             # Remove from tracking
-            del self.image_containers[path_str]
+            del self.image_containers[image_path]
+            self._queued_thumbnails.discard(image_path)
             
             # Clean up image_labels
-            for key in list(self.image_labels.keys()):
-                if id(container) == key:
-                    del self.image_labels[key]
-                    break
+            self.image_labels.pop(image_path, None)
             
             # Emit signal to notify parent about deselection
             self.image_unmarked.emit(image_path)
             
-            # Update count label and info label
-            self.update_count_label()
+            # Update info label with the new count
             self.update_info_label()
             
             # Reorganize remaining images to maintain 4-column layout
             self.reorganize_grid()
     
+    def set_images(self, marked_image_paths):
+        """Show a new set of marked images, reusing thumbnails that are already loaded"""
+        self.marked_image_paths = list(marked_image_paths)
+        wanted = set(self.marked_image_paths)
+        
+        # Drop images that are no longer marked
+        for image_path in list(self.image_containers):
+            if image_path not in wanted:
+                container = self.image_containers.pop(image_path)[0]
+                self._queued_thumbnails.discard(image_path)
+                self.grid_layout.removeWidget(container)
+                self.image_labels.pop(image_path, None)
+                container.deleteLater()
+        
+        # Load only newly marked images, reorganize_grid places them
+        for image_path in self.marked_image_paths:
+            if image_path not in self.image_containers:
+                self.image_containers[image_path] = (self.create_image_thumbnail(image_path), 0, 0)
+        
+        self.update_info_label()
+        self.reorganize_grid()
+    
     def reorganize_grid(self):
-        """Reorganize grid after removing an image"""
-        # Clear layout
-        while self.grid_layout.count() > 0:
-            item = self.grid_layout.takeAt(0)
-            if item.widget():
-                item.widget().setParent(None)
-        
-        # Re-add all containers in correct positions
-        row = 0
-        col = 0
-        for path_str in sorted(self.image_containers.keys()):
-            container, _, _ = self.image_containers[path_str]
-            self.grid_layout.addWidget(container, row, col)
-            self.image_containers[path_str] = (container, row, col)
+        """Reorganize grid after removing or adding images, moving only containers whose cell changed"""
+        self.grid_widget.setUpdatesEnabled(False)
+        try:
+            # Keep the order images were marked in, like the initial layout
+            for index, image_path in enumerate(self.marked_image_paths):
+                container, old_row, old_col = self.image_containers[image_path]
+                row, col = divmod(index, self.columns)
+                if (row, col) != (old_row, old_col) or self.grid_layout.indexOf(container) < 0:
+                    self.grid_layout.removeWidget(container)
+                    self.grid_layout.addWidget(container, row, col)
+                    self.image_containers[image_path] = (container, row, col)
             
-            col += 1
-            if col >= self.columns:
-                col = 0
-                row += 1
-        
-        # Add stretch to fill remaining rows
-        self.grid_layout.setRowStretch(row + 1, 1)
+            # Move the stretch below the last row
+            rows = (len(self.image_containers) + self.columns - 1) // self.columns
+            self.grid_layout.setRowStretch(self.stretch_row, 0)
+            self.stretch_row = rows
+            self.grid_layout.setRowStretch(self.stretch_row, 1)
+        finally:
+            self.grid_widget.setUpdatesEnabled(True)
+        
+        # Images may have moved into view
+        self.visible_timer.start()
+    
+    @staticmethod
+    def thumbnail_key(image_path):
+        """Return the QPixmapCache key of a thumbnail source, it changes with the file's modification time"""
+        try:
+            mtime_ns = os.stat(image_path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        return f"thumbnail:{image_path}:{mtime_ns}"
     
-    def scale_and_set_pixmap(self, label, pil_image, max_size):
-        """Scale PIL image and set as pixmap on label, maintaining aspect ratio"""
-        pil_image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-        qimage = ImageQt.ImageQt(pil_image)
-        pixmap = QPixmap.fromImage(qimage)
+    def scale_and_set_pixmap(self, label, pixmap, max_size):
+        """Scale pixmap down and set it on label, maintaining aspect ratio"""
+        if pixmap.width() > max_size or pixmap.height() > max_size:
+            pixmap = pixmap.scaled(max_size, max_size, Qt.AspectRatioMode.KeepAspectRatio,
+                                   Qt.TransformationMode.SmoothTransformation)
         label.setPixmap(pixmap)
     
     def update_thumbnails_size(self):
@@ -371,23 +456,25 @@ class CompareDialog(QDialog):
         scrollbar_width = self.scroll_area.verticalScrollBar().width() if self.scroll_area.verticalScrollBar().isVisible() else 0
         available_width = self.scroll_area.width() - scrollbar_width - (self.columns + 1) * 10
         max_thumb_width = max(100, available_width // self.columns)
-        
-        # Update all image labels
-        for key, (label, pil_image) in list(self.image_labels.items()):
-            try:
-                # Reload and correct orientation
-                original_path = None
-                for container in self.grid_widget.findChildren(QWidget):
-                    if id(container) == key:
-                        original_path = container.image_path
-                        break
-                
-                if original_path:
-                    pil_reloaded = Image.open(str(original_path))
-                    pil_reloaded = self.correct_image_orientation(pil_reloaded)
-                    self.scale_and_set_pixmap(label, pil_reloaded, max_thumb_width)
-            except Exception:
-                pass
+        self.thumbnail_width = max_thumb_width
+        
+        # Rescale the cached sources, nothing is read from disk again
+        for image_path, label in list(self.image_labels.items()):
+            source = QPixmapCache.find(self.thumbnail_key(image_path))
+            if source is None:
+                # Evicted from the pixmap cache, loaded again once in view
+                del self.image_labels[image_path]
+                self._queued_thumbnails.discard(image_path)
+                continue
+            self.scale_and_set_pixmap(label, source, max_thumb_width)
+        
+        # The viewport and row heights changed
+        self.visible_timer.start()
+    
+    def showEvent(self, event):
+        """Load the thumbnails in view once the grid is laid out"""
+        super().showEvent(event)
+        self.visible_timer.start()
     
     def resizeEvent(self, event):
         """Handle window resize events"""
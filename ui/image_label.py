@@ -0,0 +1,32 @@
+"""Image display label for GuckMohl"""
+from PySide6.QtWidgets import QLabel
+from PySide6.QtCore import Qt, QRect
+from PySide6.QtGui import QPainter
+
+
+class ImageLabel(QLabel):
+    """QLabel that fits its pixmap into the label while keeping the aspect ratio
+    
+    The pixmap is expected to be scaled to the label size already. While the
+    label is resized, it is drawn into the new size on the fly instead of
+    creating a scaled copy per resize event.
+    """
+    
+    def paintEvent(self, event):
+        """Draw the pixmap centered and fitted to the label"""
+        pixmap = self.pixmap()
+        if pixmap.isNull():
+            super().paintEvent(event)
+            return
+        
+        rect = self.contentsRect()
+        size = pixmap.deviceIndependentSize().toSize()
+        target = QRect(rect.topLeft(), size.scaled(rect.size(), Qt.AspectRatioMode.KeepAspectRatio))
+        target.moveCenter(rect.center())
+        
+        painter = QPainter(self)
+        if target.size() != size:
+            # Only until the owner sets a pixmap scaled for the new size
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawPixmap(target, pixmap)
+        painter.end()